@@ -0,0 +1,181 @@
+"""
+Módulo con los motores de reconocimiento de voz disponibles
+"""
+import hashlib
+import json
+import math
+import threading
+import time
+from typing import Dict, Type
+from urllib.parse import urlsplit
+
+import speech_recognition as sr
+
+from resilience import ConnectionPool, ResilientBackend, TransientError
+
+
+class RecognitionBackend:
+    """Interfaz común de los motores de reconocimiento
+
+    ``recognize`` recibe el ``sr.Recognizer`` propio del hilo que hace la
+    llamada, el segmento de audio (``sr.AudioData``) y el código de idioma.
+    Debe devolver el texto o lanzar ``sr.UnknownValueError`` si no hay voz
+    reconocible y ``sr.RequestError`` si el motor falla.
+    """
+
+    name = ''
+    label = ''
+    # Motor accesible por red: se envuelve con resilience.ResilientBackend
+    remote = False
+    # Se ofrece en la interfaz gráfica (los de pruebas solo en la línea de comandos)
+    selectable = True
+    # Frecuencia de muestreo a la que se entrega el audio (mono, 16 bits)
+    sample_rate = 16000
+
+    def recognize(self, recognizer: sr.Recognizer, audio: sr.AudioData,
+                  language: str) -> str:
+        raise NotImplementedError
+
+
+class GoogleBackend(RecognitionBackend):
+    """Google Speech Recognition (requiere conexión a Internet)
+
+    Usa el mismo formato de petición y respuesta que
+    ``Recognizer.recognize_google``, pero mantiene las conexiones abiertas
+    (keep-alive) entre llamadas. ``endpoint`` permite apuntar a otro
+    servidor, por ejemplo el simulado de ``benchmarks.speech_server``.
+    """
+
+    name = 'google'
+    label = 'Google'
+    remote = True
+    ENDPOINT = 'http://www.google.com/speech-api/v2/recognize'
+    # Respuestas que indican saturación o un fallo pasajero del servicio
+    TRANSIENT_STATUS = (408, 429, 500, 502, 503, 504)
+
+    def __init__(self, key: str = None, endpoint: str = ENDPOINT, max_connections: int = 8):
+        self.key = key
+        self.endpoint = endpoint
+        self.connections = ConnectionPool(endpoint, max_connections)
+
+    def recognize(self, recognizer, audio, language):
+        from speech_recognition.recognizers.google import OutputParser, create_request_builder
+        builder = create_request_builder(endpoint=self.endpoint, key=self.key, language=language)
+        url = urlsplit(builder.build_url())
+        status, headers, body = self.connections.request(
+            'POST', f"{url.path}?{url.query}", builder.build_data(audio),
+            builder.build_headers(audio), timeout=recognizer.operation_timeout)
+        if status in self.TRANSIENT_STATUS:
+            retry_after = headers.get('Retry-After')
+            raise TransientError(f"El motor respondió HTTP {status}",
+                                 float(retry_after) if retry_after and retry_after.isdigit() else None)
+        if status >= 400:
+            raise sr.RequestError(f"El motor respondió HTTP {status}")
+        return OutputParser(show_all=False, with_confidence=False).parse(body.decode('utf-8'))
+
+
+class SphinxBackend(RecognitionBackend):
+    """CMU PocketSphinx, sin conexión (requiere el paquete pocketsphinx)"""
+
+    name = 'sphinx'
+    label = 'PocketSphinx (sin conexión)'
+
+    def recognize(self, recognizer, audio, language):
+        return recognizer.recognize_sphinx(audio, language=language)
+
+
+class VoskBackend(RecognitionBackend):
+    """Vosk/Kaldi, sin conexión (requiere el paquete vosk y un modelo descargado)
+
+    El modelo se carga una sola vez y se comparte entre hilos; cada llamada
+    crea su propio ``KaldiRecognizer``.
+    """
+
+    name = 'vosk'
+    label = 'Vosk (sin conexión)'
+    SAMPLE_RATE = 16000
+    sample_rate = SAMPLE_RATE
+
+    def __init__(self, model_path: str = 'model'):
+        self.model_path = model_path
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        with self._lock:
+            if self._model is None:
+                try:
+                    from vosk import Model, SetLogLevel
+                except ImportError:
+                    raise sr.RequestError("vosk no está instalado")
+                SetLogLevel(-1)
+                self._model = Model(self.model_path)
+            return self._model
+
+    def recognize(self, recognizer, audio, language):
+        from vosk import KaldiRecognizer
+        kaldi = KaldiRecognizer(self._get_model(), self.SAMPLE_RATE)
+        kaldi.AcceptWaveform(audio.get_raw_data(convert_rate=self.SAMPLE_RATE,
+                                                convert_width=2))
+        text = json.loads(kaldi.FinalResult()).get('text', '')
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+class FakeBackend(RecognitionBackend):
+    """Motor simulado y determinista para pruebas y mediciones sin red
+
+    Genera un texto derivado del contenido del segmento (mismo audio, mismo
+    texto) y puede simular la latencia de un servicio remoto.
+    """
+
+    name = 'fake'
+    label = 'Simulado (pruebas)'
+    # Su texto es inventado: no debe acabar en el historial como una transcripción
+    selectable = False
+    VOCABULARY = ('hola', 'mundo', 'audio', 'texto', 'prueba', 'reunión',
+                  'proyecto', 'equipo', 'datos', 'informe', 'semana', 'cliente')
+
+    def __init__(self, latency: float = 0.0, words_per_second: float = 2.0):
+        self.latency = latency
+        self.words_per_second = words_per_second
+        self.calls = 0  # Peticiones recibidas, para las mediciones
+        self._lock = threading.Lock()
+
+    def recognize(self, recognizer, audio, language):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        data = audio.frame_data
+        if not data.strip(b'\x00'):
+            raise sr.UnknownValueError()
+        duration = len(data) / (audio.sample_rate * audio.sample_width)
+        word_count = max(1, math.ceil(duration * self.words_per_second))
+        digest = hashlib.sha256(data).digest()
+        return ' '.join(self.VOCABULARY[digest[i % len(digest)] % len(self.VOCABULARY)]
+                        for i in range(word_count))
+
+
+BACKENDS: Dict[str, Type[RecognitionBackend]] = {
+    backend.name: backend
+    for backend in (GoogleBackend, SphinxBackend, VoskBackend, FakeBackend)
+}
+
+
+def create_backend(name: str = 'google', options: dict = None,
+                   resilience: dict = None) -> RecognitionBackend:
+    """Crea el motor registrado con ese nombre
+
+    Con ``resilience`` (parámetros de ``resilience.ResilientBackend``) los
+    motores remotos se envuelven con reintentos, limitación y cortocircuito.
+    """
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Motor de reconocimiento desconocido: {name}")
+    backend = backend_class(**(options or {}))
+    if resilience is not None and backend.remote:
+        backend = ResilientBackend(backend, **resilience)
+    return backend
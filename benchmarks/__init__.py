@@ -0,0 +1,6 @@
+"""
+Mediciones de rendimiento del convertidor
+
+Cada módulo se ejecuta desde la raíz del proyecto, por ejemplo:
+    python -m benchmarks.startup
+"""
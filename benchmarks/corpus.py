@@ -0,0 +1,138 @@
+"""
+Corpus de audio sintético y determinista para las mediciones
+
+Cada caso se describe con su contenido (tono, ruido o voz simulada con
+silencios), duración, frecuencia de muestreo, canales y formato. Los
+archivos se generan por bloques, sin cargar el audio completo en memoria,
+y se guardan en un directorio de caché para no regenerarlos.
+
+Uso:
+    python -m benchmarks.corpus [--full] [--corpus-dir DIR]
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+import wave
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+import decoder
+
+# Cambiar al modificar la generación para no reutilizar archivos antiguos
+CORPUS_VERSION = 1
+BLOCK_SECONDS = 10
+
+QUICK_CASES = [
+    {'name': 'tono-16k-mono-30s', 'content': 'tone', 'seconds': 30,
+     'rate': 16000, 'channels': 1, 'format': 'wav'},
+    {'name': 'ruido-8k-mono-1min', 'content': 'noise', 'seconds': 60,
+     'rate': 8000, 'channels': 1, 'format': 'wav'},
+    {'name': 'voz-44k-estereo-5min', 'content': 'speech', 'seconds': 300,
+     'rate': 44100, 'channels': 2, 'format': 'wav'},
+    {'name': 'voz-44k-estereo-5min-mp3', 'content': 'speech', 'seconds': 300,
+     'rate': 44100, 'channels': 2, 'format': 'mp3'},
+    {'name': 'voz-48k-estereo-5min-m4a', 'content': 'speech', 'seconds': 300,
+     'rate': 48000, 'channels': 2, 'format': 'm4a'},
+]
+
+LONG_CASES = [
+    {'name': 'voz-44k-mono-1h-mp3', 'content': 'speech', 'seconds': 3600,
+     'rate': 44100, 'channels': 1, 'format': 'mp3'},
+    {'name': 'voz-16k-mono-2h', 'content': 'speech', 'seconds': 7200,
+     'rate': 16000, 'channels': 1, 'format': 'wav'},
+]
+
+
+def default_corpus_dir() -> Path:
+    return Path(tempfile.gettempdir()) / 'convertidor-corpus'
+
+
+def _seed(case):
+    return zlib.crc32(case['name'].encode('utf-8'))
+
+
+def _speech_intervals(case, rng):
+    """Intervalos con voz: frases de 2 a 15 s separadas por pausas de 0,3 a 4 s"""
+    intervals, position = [], rng.uniform(0.2, 1.0)
+    while position < case['seconds']:
+        length = rng.uniform(2, 15)
+        intervals.append((position, min(case['seconds'], position + length)))
+        position += length + rng.uniform(0.3, 4.0)
+    return np.array(intervals)
+
+
+def _block(case, start, count, rng, intervals):
+    """Muestras mono (float, escala de 16 bits) desde la muestra ``start``"""
+    rate = case['rate']
+    t = (start + np.arange(count)) / rate
+    content = case['content']
+    if content == 'tone':
+        return 8000 * np.sin(2 * np.pi * 440 * t) + 2000 * np.sin(2 * np.pi * 880 * t)
+    noise = rng.standard_normal(count)
+    if content == 'noise':
+        return 3000 * noise
+    # Voz simulada: armónicos con tono variable y envolvente silábica, solo
+    # dentro de los intervalos con voz, más un ruido de fondo bajo
+    phase = 2 * np.pi * (150 * t - 30 / (2 * np.pi * 0.4) * np.cos(2 * np.pi * 0.4 * t))
+    voice = sum(np.sin(k * phase) / k for k in range(1, 10))
+    envelope = np.sin(2 * np.pi * 2.5 * t) ** 2
+    index = np.searchsorted(intervals[:, 0], t, side='right') - 1
+    speaking = (index >= 0) & (t < intervals[np.maximum(index, 0), 1])
+    return 5000 * voice * envelope * speaking + 60 * noise
+
+
+def write_wav(case, path):
+    """Genera el caso en WAV PCM de 16 bits, bloque a bloque"""
+    rng = np.random.default_rng(_seed(case))
+    intervals = _speech_intervals(case, np.random.default_rng(_seed(case) + 1))
+    rate, channels = case['rate'], case['channels']
+    total = int(case['seconds'] * rate)
+    with wave.open(str(path), 'wb') as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        for start in range(0, total, BLOCK_SECONDS * rate):
+            count = min(BLOCK_SECONDS * rate, total - start)
+            mono = _block(case, start, count, rng, intervals)
+            frames = np.stack([mono * (1 - 0.2 * c) for c in range(channels)], axis=1)
+            f.writeframes(np.clip(frames, -32768, 32767).astype('<i2').tobytes())
+
+
+def ensure_case(case, corpus_dir=None) -> Path:
+    """Devuelve la ruta del archivo del caso, generándolo si no existe"""
+    corpus_dir = Path(corpus_dir or default_corpus_dir())
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    path = corpus_dir / f"v{CORPUS_VERSION}-{case['name']}.{case['format']}"
+    if path.exists():
+        return path
+    partial = path.with_name(f".{path.stem}.partial.wav")
+    write_wav(case, partial)
+    if case['format'] == 'wav':
+        partial.replace(path)
+        return path
+    try:
+        encoded = path.with_name(f".{path.stem}.partial.{case['format']}")
+        subprocess.run([decoder.find_ffmpeg(), '-nostdin', '-loglevel', 'error', '-y',
+                        '-i', str(partial), str(encoded)], check=True)
+        encoded.replace(path)
+    finally:
+        partial.unlink(missing_ok=True)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--full', action='store_true', help='Incluir los casos de 1 y 2 horas')
+    parser.add_argument('--corpus-dir', help=f'Directorio de caché (por defecto {default_corpus_dir()})')
+    args = parser.parse_args(argv)
+    for case in QUICK_CASES + (LONG_CASES if args.full else []):
+        path = ensure_case(case, args.corpus_dir)
+        print(f"{path.stat().st_size / 1024 / 1024:8.1f} MB  {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Mide el tamaño de lo que se envía al reconocedor y el tiempo de preparación
+y subida, con el audio a su frecuencia original y reducido a 16 kHz mono
+
+Uso:
+    python -m benchmarks.payload [--seconds 60] [--uplink-mbps 5] [--json resultados.json]
+
+Genera un audio sintético estéreo a 44,1 kHz y lo codifica en WAV, MP3 y
+M4A. Para cada formato decodifica el primer segmento de ``--chunk-seconds``
+de las dos formas y lo codifica en FLAC, como hace el motor de Google antes
+de subirlo. La subida se estima con el ancho de banda ``--uplink-mbps``.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+import decoder
+import probe
+
+SOURCE_RATE = 44100
+
+
+def write_fixture(path, seconds):
+    """Audio estéreo a 44,1 kHz con armónicos modulados y ruido (parecido a la voz)"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * SOURCE_RATE)) / SOURCE_RATE
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SOURCE_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 12))
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t) ** 2
+    mono = 6000 * voice * envelope + 300 * rng.standard_normal(len(t))
+    stereo = np.stack([mono, 0.8 * mono], axis=1)
+    with wave.open(str(path), 'wb') as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(SOURCE_RATE)
+        f.writeframes(np.clip(stereo, -32768, 32767).astype('<i2').tobytes())
+
+
+def encode(source, target):
+    subprocess.run([decoder.find_ffmpeg(), '-nostdin', '-loglevel', 'error', '-y',
+                    '-i', str(source), str(target)], check=True)
+
+
+def measure(path, sample_rate, chunk_seconds, uplink_mbps, workspace):
+    """Decodifica el primer segmento y lo prepara como lo enviaría el motor de Google"""
+    start = time.perf_counter()
+    segments = decoder.iter_segments(str(path), chunk_seconds, sample_rate=sample_rate,
+                                     workspace=workspace)
+    try:
+        audio = next(segments)
+    finally:
+        segments.close()
+    decoded = time.perf_counter()
+    flac = audio.get_flac_data(convert_width=2)
+    encoded = time.perf_counter()
+    upload_ms = len(flac) * 8 / (uplink_mbps * 1e6) * 1000
+    return {
+        'sample_rate': audio.sample_rate,
+        'pcm_bytes': len(audio.frame_data),
+        'flac_bytes': len(flac),
+        'decode_ms': (decoded - start) * 1000,
+        'flac_ms': (encoded - decoded) * 1000,
+        'upload_ms': upload_ms,
+        'total_ms': (encoded - start) * 1000 + upload_ms,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=60)
+    parser.add_argument('--chunk-seconds', type=float, default=30)
+    parser.add_argument('--uplink-mbps', type=float, default=5.0,
+                        help='Ancho de banda de subida para estimar la latencia')
+    parser.add_argument('--json', help='Guardar los resultados en este archivo')
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        work_dir = Path(work_dir)
+        wav = work_dir / 'muestra.wav'
+        write_fixture(wav, args.seconds)
+        fixtures = {'wav': wav}
+        for extension in ('mp3', 'm4a'):
+            fixtures[extension] = work_dir / f'muestra.{extension}'
+            encode(wav, fixtures[extension])
+
+        for name, path in fixtures.items():
+            native_rate = probe.probe(str(path)).get('sample_rate') or SOURCE_RATE
+            results[name] = {
+                'original': measure(path, native_rate, args.chunk_seconds,
+                                    args.uplink_mbps, str(work_dir)),
+                '16k': measure(path, decoder.TARGET_SAMPLE_RATE, args.chunk_seconds,
+                               args.uplink_mbps, str(work_dir)),
+            }
+
+    print(f"Segmento de {args.chunk_seconds:g} s, subida a {args.uplink_mbps:g} Mbit/s\n")
+    print(f"{'Formato':8} {'Frecuencia':>11} {'PCM':>10} {'FLAC':>10} "
+          f"{'Preparar':>9} {'Subir':>8} {'Total':>8}")
+    for name, variants in results.items():
+        for variant in ('original', '16k'):
+            r = variants[variant]
+            print(f"{name:8} {r['sample_rate']:>8} Hz {r['pcm_bytes'] / 1024:>7.0f} KB "
+                  f"{r['flac_bytes'] / 1024:>7.0f} KB {r['decode_ms'] + r['flac_ms']:>6.0f} ms "
+                  f"{r['upload_ms']:>5.0f} ms {r['total_ms']:>5.0f} ms")
+        original, reduced = variants['original'], variants['16k']
+        print(f"{'':8} reducción: {original['flac_bytes'] / reduced['flac_bytes']:.1f}x bytes, "
+              f"{original['total_ms'] / reduced['total_ms']:.1f}x tiempo\n")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
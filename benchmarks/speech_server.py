@@ -0,0 +1,197 @@
+"""
+Servidor HTTP local que imita la API de reconocimiento de Google, con
+latencia y errores configurables, y prueba de carga del cliente resistente
+
+Uso:
+    python -m benchmarks.speech_server --serve [--port 8765] [--latency 0.2] [--error-rate 0.2]
+    python -m benchmarks.speech_server [--segments 200] [--workers 8] [--error-rate 0.3] [--rps 20]
+
+Con ``--serve`` solo arranca el servidor; para usarlo desde la aplicación,
+en ``config.json``:
+    "backend_options": {"google": {"endpoint": "http://127.0.0.1:8765/speech-api/v2/recognize"}}
+
+Sin ``--serve`` arranca el servidor en segundo plano y envía ``--segments``
+segmentos con ``--workers`` hilos a través de ``ResilientBackend``,
+mostrando el rendimiento, los reintentos y las conexiones abiertas.
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import speech_recognition as sr
+
+from backends import GoogleBackend
+from resilience import ResilientBackend
+
+
+class FakeSpeechServer(ThreadingHTTPServer):
+    """Servidor simulado; ``stats`` cuenta peticiones, errores y conexiones"""
+
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, jitter=0.0, error_rate=0.0,
+                 throttle_rate=0.0, seed=0):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.random = random.Random(seed)
+        self.stats = {'connections': 0, 'requests': 0, 'errors': 0, 'throttled': 0}
+        self.lock = threading.Lock()
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def draw(self):
+        with self.lock:
+            return self.random.random(), self.random.uniform(0, self.jitter)
+
+    @property
+    def endpoint(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/speech-api/v2/recognize"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # HTTP/1.1 para mantener la conexión abierta entre peticiones
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.count('connections')
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length)
+        server = self.server
+        server.count('requests')
+        chance, jitter = server.draw()
+        time.sleep(server.latency + jitter)
+        if chance < server.throttle_rate:
+            server.count('throttled')
+            return self._reply(429, b'', {'Retry-After': '1'})
+        if chance < server.throttle_rate + server.error_rate:
+            server.count('errors')
+            return self._reply(503, b'')
+        transcript = f"segmento de {len(body)} bytes"
+        payload = (json.dumps({'result': []}) + '\n' + json.dumps({
+            'result': [{'alternative': [{'transcript': transcript, 'confidence': 0.9}],
+                        'final': True}],
+            'result_index': 0}) + '\n').encode('utf-8')
+        self._reply(200, payload)
+
+    def _reply(self, status, payload, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def start_server(port=0, **options):
+    """Arranca el servidor en un hilo y lo devuelve"""
+    server = FakeSpeechServer(('127.0.0.1', port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_load(server, segments, workers, resilience):
+    """Envía ``segments`` segmentos de 1 s y devuelve las estadísticas"""
+    backend = ResilientBackend(GoogleBackend(endpoint=server.endpoint), **resilience)
+    audio = sr.AudioData(b'\x10\x00' * 16000, 16000, 2)
+    local = threading.local()
+
+    def recognize(_):
+        recognizer = getattr(local, 'recognizer', None)
+        if recognizer is None:
+            recognizer = local.recognizer = sr.Recognizer()
+            recognizer.operation_timeout = 10
+        try:
+            backend.recognize(recognizer, audio, 'es-ES')
+            return True
+        except sr.RequestError:
+            return False
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(recognize, range(segments)))
+    elapsed = time.perf_counter() - start
+    return {
+        'segments': segments,
+        'succeeded': sum(results),
+        'failed': segments - sum(results),
+        'elapsed_s': elapsed,
+        'segments_per_s': segments / elapsed,
+        'client': dict(backend.stats),
+        'connections_opened': backend.backend.connections.created,
+        'server': dict(server.stats),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--serve', action='store_true', help='Solo arrancar el servidor')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--error-rate', type=float, default=0.2,
+                        help='Fracción de respuestas 503')
+    parser.add_argument('--throttle-rate', type=float, default=0.1,
+                        help='Fracción de respuestas 429 (con Retry-After)')
+    parser.add_argument('--segments', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--rps', type=float, default=None, help='Límite de peticiones por segundo')
+    parser.add_argument('--max-attempts', type=int, default=4)
+    parser.add_argument('--json', help='Guardar los resultados en este archivo')
+    args = parser.parse_args(argv)
+
+    options = dict(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                   throttle_rate=args.throttle_rate)
+    if args.serve:
+        server = FakeSpeechServer(('127.0.0.1', args.port), **options)
+        print(f"Escuchando en {server.endpoint}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    # Esperas cortas para que la prueba dure poco; Retry-After sigue respetándose
+    resilience = dict(requests_per_second=args.rps, max_attempts=args.max_attempts,
+                      base_delay=0.05, max_delay=1.0, failure_threshold=20, reset_timeout=1.0)
+    server = start_server(0, **options)
+    try:
+        result = run_load(server, args.segments, args.workers, resilience)
+    finally:
+        server.shutdown()
+
+    client, srv = result['client'], result['server']
+    print(f"{result['succeeded']}/{result['segments']} segmentos reconocidos en "
+          f"{result['elapsed_s']:.1f} s ({result['segments_per_s']:.1f}/s)")
+    print(f"Llamadas: {client['calls']}, reintentos: {client['retries']}, "
+          f"esperas por cortocircuito: {client['circuit_waits']}")
+    print(f"Servidor: {srv['requests']} peticiones, {srv['errors']} errores 503, "
+          f"{srv['throttled']} respuestas 429")
+    print(f"Conexiones abiertas: {result['connections_opened']} "
+          f"(servidor: {srv['connections']}) para {srv['requests']} peticiones")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    return 0 if not result['failed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
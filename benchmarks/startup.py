@@ -0,0 +1,118 @@
+"""
+Mide el arranque de la interfaz gráfica: tiempo hasta la primera ventana
+y tiempo de importación de cada módulo
+
+Uso:
+    python -m benchmarks.startup [--runs 5] [--budget-ms 1500] [--top 15]
+
+Cada medición se hace en un proceso nuevo (arranque en frío del intérprete).
+Con ``--budget-ms`` el comando termina con código 1 si la mediana del tiempo
+hasta la primera ventana supera el presupuesto.
+"""
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+# Se ejecuta en el proceso hijo: importa gui, crea la ventana y mide hasta
+# que el bucle de eventos procesa el primer evento tras mostrarla
+_FIRST_WINDOW_SCRIPT = r'''
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {project!r})
+import gui
+imported = time.perf_counter()
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QTimer
+app = QApplication(sys.argv)
+window = gui.AudioConverterApp()
+window.show()
+def shown():
+    print(json.dumps({{'import_ms': (imported - start) * 1000,
+                      'first_window_ms': (time.perf_counter() - start) * 1000,
+                      'modules': sorted(m for m in sys.modules if '.' not in m)}}))
+    app.quit()
+QTimer.singleShot(0, shown)
+app.exec()
+'''
+
+_IMPORTTIME_RE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def measure_first_window(work_dir):
+    """Arranca la ventana en un proceso nuevo y devuelve sus tiempos"""
+    completed = subprocess.run(
+        [sys.executable, '-c', _FIRST_WINDOW_SCRIPT.format(project=str(PROJECT_DIR))],
+        cwd=work_dir, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure_imports(work_dir, top):
+    """Tiempo acumulado de importación de cada módulo que importa gui (python -X importtime)"""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c',
+         f'import sys; sys.path.insert(0, {str(PROJECT_DIR)!r}); import gui'],
+        cwd=work_dir, capture_output=True, text=True, check=True)
+    entries = []
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            entries.append((len(match.group(3)), match.group(4), int(match.group(2)) / 1000))
+    # importtime escribe cada módulo después de sus dependencias: las importaciones
+    # directas de gui son las de sangría 3 inmediatamente anteriores a la línea de gui
+    modules = []
+    gui_index = max(i for i, (_, name, _) in enumerate(entries) if name == 'gui')
+    for indent, name, cumulative_ms in reversed(entries[:gui_index]):
+        if indent < 3:
+            break
+        if indent == 3:
+            modules.append((name, cumulative_ms))
+    return sorted(modules, key=lambda item: item[1], reverse=True)[:top]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help='Presupuesto para el tiempo hasta la primera ventana')
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--json', help='Guardar los resultados en este archivo')
+    args = parser.parse_args(argv)
+
+    # Directorio vacío: sin config.json, historial ni caché previos
+    with tempfile.TemporaryDirectory() as work_dir:
+        runs = [measure_first_window(work_dir) for _ in range(args.runs)]
+        imports = measure_imports(work_dir, args.top)
+
+    first_window = statistics.median(run['first_window_ms'] for run in runs)
+    import_ms = statistics.median(run['import_ms'] for run in runs)
+    heavy = [name for name in ('speech_recognition', 'langdetect', 'docx', 'reportlab',
+                               'moviepy', 'numpy') if name in runs[-1]['modules']]
+
+    print(f"Tiempo hasta la primera ventana (mediana de {args.runs}): {first_window:.0f} ms")
+    print(f"Importación de gui (mediana): {import_ms:.0f} ms")
+    print(f"Módulos pesados cargados al arrancar: {', '.join(heavy) or 'ninguno'}")
+    print("\nImportaciones más lentas (acumulado):")
+    for name, ms in imports:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'first_window_ms': first_window, 'import_ms': import_ms,
+                       'heavy_modules': heavy,
+                       'imports_ms': dict(imports), 'runs': runs}, f, indent=2)
+
+    if args.budget_ms is not None and first_window > args.budget_ms:
+        print(f"\nPresupuesto superado: {first_window:.0f} ms > {args.budget_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""
+Mide el proceso completo sobre el corpus sintético: tiempo de cada etapa,
+memoria máxima y factor de tiempo real, con un motor simulado
+
+Uso:
+    python -m benchmarks.suite [--full] [--latency 0.3] [--workers 4] [--vad]
+                               [--json resultados.json] [--baseline anterior.json]
+
+Cada caso se ejecuta en un proceso nuevo, de modo que la memoria máxima
+(RSS) corresponde solo a ese caso. Las etapas son: sondeo de cabeceras,
+decodificación completa, detección de voz (si se usa ``--vad``) y
+transcripción completa con ``FakeBackend``, cuya latencia imita la de un
+servicio remoto. Se cuenta también el número de peticiones al motor: con
+``--vad`` no debería superar al de ventanas fijas. El factor de tiempo real es el tiempo de la transcripción
+dividido entre la duración del audio (menor que 1: más rápido que el audio).
+
+Con ``--baseline`` se comparan los tiempos con un JSON guardado antes y el
+comando termina con código 1 si algún caso es más lento que la tolerancia.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks import corpus
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+def peak_rss_mb():
+    """Memoria residente máxima del proceso en MB, o None si no se puede medir"""
+    try:
+        import resource
+    except ImportError:
+        return _windows_peak_rss_mb()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux la da en KB y macOS en bytes
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def _windows_peak_rss_mb():
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t),
+                        ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t),
+                        ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters),
+                                                        counters.cb):
+            return None
+        return counters.PeakWorkingSetSize / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def run_case(path, chunk_seconds, workers, latency, vad):
+    """Ejecuta las etapas sobre un archivo y devuelve sus tiempos (en el proceso actual)"""
+    import decoder
+    import probe
+    from backends import FakeBackend
+    from pipeline import TranscriptionJob
+    from vad import VoiceActivityDetector
+
+    stages = {}
+    start = time.perf_counter()
+    info = probe.probe(path)
+    stages['probe'] = time.perf_counter() - start
+    duration = info.get('duration') or 0
+    sample_rate = min(info.get('sample_rate') or FakeBackend.sample_rate, FakeBackend.sample_rate)
+
+    start = time.perf_counter()
+    decoded_bytes = 0
+    with closing(decoder.iter_segments(path, chunk_seconds, sample_rate=sample_rate)) as segments:
+        for audio in segments:
+            decoded_bytes += len(audio.frame_data)
+    stages['decode'] = time.perf_counter() - start
+
+    speech_seconds = None
+    if vad:
+        start = time.perf_counter()
+        with closing(decoder.iter_segments(path, chunk_seconds, sample_rate=sample_rate)) as segments:
+            speech_seconds = sum(segment.duration for segment in
+                                 VoiceActivityDetector(chunk_seconds).split(segments))
+        # Solo el coste añadido sobre la decodificación
+        stages['vad'] = max(0.0, time.perf_counter() - start - stages['decode'])
+
+    backend = FakeBackend(latency=latency)
+    job = TranscriptionJob(path, chunk_seconds=chunk_seconds, max_workers=workers,
+                           backend=backend, vad=vad)
+    start = time.perf_counter()
+    result = job.run()
+    stages['transcribe'] = time.perf_counter() - start
+
+    return {
+        'duration_s': duration,
+        'decoded_mb': decoded_bytes / (1024 * 1024),
+        'speech_s': speech_seconds,
+        'word_count': result['word_count'],
+        'requests': backend.calls,
+        'stages_s': stages,
+        # Desglose interno de la transcripción (intervalos de tracing)
+        'job_timings': result['timings'],
+        'real_time_factor': stages['transcribe'] / duration if duration else None,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def measure_case(path, args):
+    """Mide un caso en un proceso nuevo"""
+    options = {'path': str(path), 'chunk_seconds': args.chunk_seconds,
+               'workers': args.workers, 'latency': args.latency, 'vad': args.vad}
+    completed = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.suite', '--child', json.dumps(options)],
+        cwd=PROJECT_DIR, capture_output=True, text=True)
+    if completed.returncode:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr
+                           else f"código {completed.returncode}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance):
+    """Muestra la variación frente a ``baseline``; devuelve los casos más lentos"""
+    previous = {case['name']: case for case in baseline.get('cases', [])}
+    slower = []
+    print("\nComparación con la referencia (transcripción):")
+    for case in results['cases']:
+        old = previous.get(case['name'])
+        if not old or 'stages_s' not in case or 'stages_s' not in old:
+            continue
+        before, after = old['stages_s']['transcribe'], case['stages_s']['transcribe']
+        change = (after - before) / before if before else 0.0
+        mark = ''
+        if change > tolerance:
+            slower.append(case['name'])
+            mark = '  <- más lento'
+        requests = ''
+        if 'requests' in old and 'requests' in case:
+            requests = f"  peticiones {old['requests']} -> {case['requests']}"
+        print(f"  {case['name']:28} {before:8.2f} s -> {after:8.2f} s ({change:+.0%}){mark}{requests}")
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--full', action='store_true', help='Incluir los casos de 1 y 2 horas')
+    parser.add_argument('--case', action='append', help='Medir solo los casos indicados')
+    parser.add_argument('--corpus-dir', help='Directorio del corpus generado')
+    parser.add_argument('--chunk-seconds', type=int, default=30)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.3,
+                        help='Latencia simulada de cada llamada al motor (s)')
+    parser.add_argument('--vad', action='store_true', help='Omitir los silencios')
+    parser.add_argument('--json', help='Guardar los resultados en este archivo')
+    parser.add_argument('--baseline', help='JSON de una medición anterior para comparar')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='Aumento relativo admitido frente a la referencia')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_case(**json.loads(args.child))))
+        return 0
+
+    cases = corpus.QUICK_CASES + (corpus.LONG_CASES if args.full else [])
+    if args.case:
+        cases = [case for case in cases if case['name'] in args.case]
+
+    results = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {'chunk_seconds': args.chunk_seconds, 'workers': args.workers,
+                     'latency': args.latency, 'vad': args.vad},
+        'cases': [],
+    }
+    print(f"{'caso':28} {'audio':>8} {'sondeo':>8} {'decodif.':>8} {'vad':>7} "
+          f"{'transcr.':>8} {'petic.':>6} {'RTF':>6} {'RSS':>8}")
+    for case in cases:
+        path = corpus.ensure_case(case, args.corpus_dir)
+        entry = {'name': case['name'], 'case': case}
+        try:
+            entry.update(measure_case(path, args))
+        except Exception as e:
+            entry['error'] = str(e)
+            print(f"{case['name']:28} error: {e}")
+            results['cases'].append(entry)
+            continue
+        results['cases'].append(entry)
+        stages = entry['stages_s']
+        rss = f"{entry['peak_rss_mb']:.0f} MB" if entry['peak_rss_mb'] is not None else '-'
+        rtf = f"{entry['real_time_factor']:.3f}" if entry['real_time_factor'] is not None else '-'
+        vad = f"{stages['vad']:.2f}" if 'vad' in stages else '-'
+        print(f"{case['name']:28} {entry['duration_s']:7.0f}s {stages['probe'] * 1000:6.1f}ms "
+              f"{stages['decode']:7.2f}s {vad:>7} {stages['transcribe']:7.2f}s "
+              f"{entry['requests']:>6} {rtf:>6} {rss:>8}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    failed = any('error' in case for case in results['cases'])
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            slower = compare(results, json.load(f), args.tolerance)
+        if slower:
+            print(f"\nMás lentos que la referencia (>{args.tolerance:.0%}): {', '.join(slower)}")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Módulo para guardar en disco las transcripciones ya realizadas
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class TranscriptionCache:
+    """Caché persistente de transcripciones direccionada por contenido
+
+    Cada entrada se identifica por el hash del audio decodificado, el idioma
+    y el motor de reconocimiento, así que el mismo audio subido con otro
+    nombre también se encuentra. Un índice por (ruta, tamaño, fecha) evita
+    volver a decodificar archivos ya vistos. Cuando el tamaño total supera
+    ``max_bytes`` se eliminan las entradas usadas hace más tiempo (LRU).
+    """
+
+    ENTRY_SUFFIX = '.json'
+
+    def __init__(self, cache_dir: str = "cache", max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.files_dir = self.cache_dir / 'files'
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.files_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def audio_hasher():
+        """Hash del audio decodificado: se actualiza con el ``frame_data`` de cada segmento
+
+        Solo depende del PCM concatenado, no de cómo se divida en segmentos.
+        """
+        return hashlib.sha256()
+
+    @staticmethod
+    def make_key(audio_hash: str, language: str, backend: str, variant: str = '') -> str:
+        """Clave de una transcripción: audio + idioma + motor (+ preprocesado, p. ej. 'vad')"""
+        key = f"{audio_hash}\0{language}\0{backend}"
+        if variant:
+            key += f"\0{variant}"
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def _fingerprint_path(self, path: str) -> Path:
+        stat = os.stat(path)
+        fingerprint = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        return self.files_dir / hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()
+
+    def get_audio_hash(self, path: str) -> Optional[str]:
+        """Devuelve el hash del audio de un archivo ya visto (sin decodificarlo)"""
+        try:
+            return self._fingerprint_path(path).read_text(encoding='utf-8').strip() or None
+        except OSError:
+            return None
+
+    def remember_audio_hash(self, path: str, audio_hash: str):
+        """Asocia el archivo (ruta, tamaño, fecha) al hash de su audio"""
+        try:
+            self._write_atomic(self._fingerprint_path(path), audio_hash)
+        except OSError as e:
+            print(f"Error al guardar en caché: {e}")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Obtiene una transcripción guardada y la marca como usada recientemente"""
+        entry = self.cache_dir / f"{key}{self.ENTRY_SUFFIX}"
+        try:
+            with open(entry, 'r', encoding='utf-8') as f:
+                value = json.load(f)
+            os.utime(entry)
+            return value
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, value: Dict):
+        """Guarda una transcripción y aplica el límite de tamaño"""
+        entry = self.cache_dir / f"{key}{self.ENTRY_SUFFIX}"
+        try:
+            self._write_atomic(entry, json.dumps(value, ensure_ascii=False))
+            self.evict()
+        except OSError as e:
+            print(f"Error al guardar en caché: {e}")
+
+    def evict(self):
+        """Elimina las entradas menos usadas hasta respetar ``max_bytes``"""
+        with self._lock:
+            entries = []
+            for entry in self.cache_dir.glob(f"*{self.ENTRY_SUFFIX}"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry))
+            total = sum(size for _, size, _ in entries)
+            for _, size, entry in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    entry.unlink()
+                    total -= size
+                except OSError:
+                    pass
+
+    def clear(self):
+        """Vacía la caché"""
+        with self._lock:
+            for entry in list(self.cache_dir.glob(f"*{self.ENTRY_SUFFIX}")) + list(self.files_dir.iterdir()):
+                try:
+                    entry.unlink()
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _write_atomic(path: Path, content: str):
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
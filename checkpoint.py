@@ -0,0 +1,127 @@
+"""
+Módulo para guardar el avance de las transcripciones largas y poder reanudarlas
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class CheckpointJournal:
+    """Registro de las ventanas ya transcritas de un archivo
+
+    Cada ventana reconocida se añade como una línea JSON y se vuelca a disco
+    en el momento, de modo que si la aplicación se cierra o la red falla a
+    mitad de un archivo largo, la siguiente ejecución solo reconoce las
+    ventanas que faltan. Una última línea incompleta (escritura interrumpida)
+    se ignora al leer.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.chunks: Dict[tuple, str] = {}
+        self.language = None  # Idioma final, una vez decidido
+        self.detected = None  # Código langdetect de la muestra
+        self._lock = threading.Lock()
+        self._file = None
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if 'index' in entry:
+                        self.chunks[(entry['index'], entry['language'])] = entry['text']
+                    elif 'final_language' in entry:
+                        self.language = entry['final_language']
+                        self.detected = entry.get('detected')
+        except OSError:
+            pass
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def get(self, index: int, language: str) -> Optional[str]:
+        """Texto ya reconocido de la ventana en ese idioma, o None"""
+        return self.chunks.get((index, language))
+
+    def record(self, index: int, language: str, text: str):
+        """Guarda el texto de una ventana reconocida"""
+        with self._lock:
+            self.chunks[(index, language)] = text
+            self._append({'index': index, 'language': language, 'text': text})
+
+    def set_language(self, language: str, detected: Optional[str]):
+        """Guarda el idioma final elegido tras la detección"""
+        with self._lock:
+            self.language = language
+            self.detected = detected
+            self._append({'final_language': language, 'detected': detected})
+
+    def _append(self, entry):
+        try:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            print(f"Error al guardar el punto de control: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def discard(self):
+        """Elimina el registro (la transcripción terminó)"""
+        self.close()
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+
+class CheckpointStore:
+    """Directorio con los registros de las transcripciones sin terminar"""
+
+    JOURNAL_SUFFIX = '.jsonl'
+    # Los registros abandonados se eliminan pasado este tiempo
+    MAX_AGE = 7 * 24 * 3600
+
+    def __init__(self, checkpoint_dir: str = "checkpoints"):
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(path: str, language: str, backend: str, chunk_seconds: int,
+                 variant: str = '') -> str:
+        """Identidad del trabajo: archivo (ruta, tamaño, fecha), idioma, motor y ventana"""
+        stat = os.stat(path)
+        identity = (f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+                    f"|{language}|{backend}|{chunk_seconds}")
+        if variant:
+            identity += f"|{variant}"
+        return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+    def open(self, key: str) -> CheckpointJournal:
+        """Abre (o crea) el registro del trabajo"""
+        return CheckpointJournal(self.checkpoint_dir / f"{key}{self.JOURNAL_SUFFIX}")
+
+    def prune(self, max_age: float = MAX_AGE):
+        """Elimina los registros que no se han reanudado en ``max_age`` segundos"""
+        limit = time.time() - max_age
+        for journal in self.checkpoint_dir.glob(f"*{self.JOURNAL_SUFFIX}"):
+            try:
+                if journal.stat().st_mtime < limit:
+                    journal.unlink()
+            except OSError:
+                pass
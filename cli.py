@@ -0,0 +1,250 @@
+"""
+Transcripción por lotes desde la línea de comandos, sin interfaz gráfica
+
+Uso:
+    python cli.py transcribe grabaciones/*.mp3 --jobs 8 --lang es-ES --out textos/
+
+No importa PyQt6, por lo que puede ejecutarse en servidores sin pantalla
+(por ejemplo, desde cron).
+"""
+import argparse
+import glob
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from backends import BACKENDS, create_backend
+from cache import TranscriptionCache
+from checkpoint import CheckpointStore
+from config import AppConfig
+from exporters import EXPORTERS, ExportError, export
+from pipeline import ConversionError, TranscriptionJob
+from tracing import export_chrome_trace, format_summary
+from workspace import sweep_orphans
+
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.m4a')
+OUTPUT_FORMATS = ('txt', 'json', 'md', 'docx', 'pdf')
+
+
+def expand_inputs(patterns):
+    """Expande los comodines (en Windows la consola no lo hace) y descarta formatos no soportados"""
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        files.extend(path for path in matches if path.lower().endswith(AUDIO_EXTENSIONS))
+    return list(dict.fromkeys(files))
+
+
+def output_stems(files):
+    """Nombre base de las salidas de cada archivo y los grupos de archivos que coinciden
+
+    Se usa el nombre sin extensión; si dos entradas lo comparten (``a.wav`` y
+    ``a.mp3``) se conserva la extensión (``a.wav.txt``). Se comparan sin
+    distinguir mayúsculas, como en Windows y macOS. Si aun así coinciden (el
+    mismo nombre en carpetas distintas) se devuelven en el segundo valor.
+    """
+    by_stem = {}
+    for audio_file in files:
+        by_stem.setdefault(Path(audio_file).stem.casefold(), []).append(audio_file)
+    stems = {audio_file: (Path(audio_file).stem
+                          if len(by_stem[Path(audio_file).stem.casefold()]) == 1
+                          else Path(audio_file).name)
+             for audio_file in files}
+    by_output = {}
+    for audio_file, stem in stems.items():
+        by_output.setdefault(stem.casefold(), []).append(audio_file)
+    return stems, [group for group in by_output.values() if len(group) > 1]
+
+
+def write_outputs(audio_file, result, out_dir, formats, trace=False, stem=None):
+    """Escribe la transcripción en los formatos pedidos y devuelve las rutas creadas
+
+    ``stem`` es el nombre base de las salidas (por defecto, el del audio sin
+    extensión; ver ``output_stems``). El JSON incluye el tiempo total de cada
+    etapa (``timings``); con ``trace`` los intervalos completos se guardan
+    aparte como traza de Chrome. Lanza ``ExportError`` si no se puede generar
+    un Markdown, Word o PDF.
+    """
+    stem = stem or Path(audio_file).stem
+    written = []
+    if 'txt' in formats:
+        path = out_dir / f"{stem}.txt"
+        path.write_text(result['text'], encoding='utf-8')
+        written.append(path)
+    if 'json' in formats:
+        path = out_dir / f"{stem}.json"
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'source': str(Path(audio_file).resolve()),
+                       **{key: value for key, value in result.items() if key != 'trace'}},
+                      f, ensure_ascii=False, indent=2)
+        written.append(path)
+    # Markdown, Word y PDF con los mismos exportadores que la interfaz
+    for format_type in EXPORTERS:
+        if format_type in formats:
+            path = out_dir / f"{stem}.{format_type}"
+            export(result['text'], str(path), format_type)
+            written.append(path)
+    if trace and result.get('trace'):
+        path = out_dir / f"{stem}.trace.json"
+        export_chrome_trace(result['trace'], path, Path(audio_file).name)
+        written.append(path)
+    return written
+
+
+def transcribe(args) -> int:
+    """Transcribe todos los archivos indicados; devuelve el código de salida"""
+    config = AppConfig(args.config)
+    files = expand_inputs(args.files)
+    if not files:
+        print("No se encontraron archivos de audio (.mp3, .wav, .m4a)", file=sys.stderr)
+        return 2
+
+    formats = {fmt.strip() for fmt in args.format.split(',') if fmt.strip()}
+    unknown = formats - set(OUTPUT_FORMATS)
+    if unknown or not formats:
+        print(f"Formato de salida no soportado: {', '.join(sorted(unknown)) or args.format}",
+              file=sys.stderr)
+        return 2
+    stems, collisions = output_stems(files)
+    if collisions:
+        # Se comprueba antes de convertir: si no, una salida sobrescribiría a otra
+        print("Varias entradas generarían los mismos archivos de salida:", file=sys.stderr)
+        for group in collisions:
+            print(f"  {', '.join(group)}", file=sys.stderr)
+        return 2
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    backend_name = args.backend or config.get_backend()
+    backend = create_backend(backend_name, config.get_backend_options(backend_name),
+                             config.get_resilience_settings())
+    cache_settings = config.get_cache_settings()
+    cache = None
+    if cache_settings['enabled'] and not args.no_cache:
+        cache = TranscriptionCache(cache_settings['cache_dir'], cache_settings['max_bytes'])
+    checkpoint_settings = config.get_checkpoint_settings()
+    checkpoints = None
+    if checkpoint_settings['enabled'] and not args.no_resume:
+        checkpoints = CheckpointStore(checkpoint_settings['checkpoint_dir'])
+        checkpoints.prune()
+    temp_root = config.get_temp_root()
+    sweep_orphans(temp_root)
+
+    jobs = []
+
+    def run_job(audio_file):
+        on_status = None
+        if args.verbose:
+            name = Path(audio_file).name
+            on_status = lambda message: print(f"  {name}: {message}", file=sys.stderr)
+        job = TranscriptionJob(
+            audio_file, args.lang or config.get_language(),
+            temp_dir=temp_root,
+            chunk_seconds=args.chunk_seconds or config.get_chunk_seconds(),
+            max_workers=args.workers or config.get_recognition_workers(),
+            backend=backend,
+            cache=cache,
+            checkpoints=checkpoints,
+            vad=config.get_vad_enabled() and not args.no_vad,
+            on_status=on_status,
+        )
+        jobs.append(job)
+        return job.run()
+
+    start = time.time()
+    failed = 0
+    audio_seconds = 0.0
+    executor = ThreadPoolExecutor(max_workers=max(1, args.jobs))
+    futures = {executor.submit(run_job, audio_file): audio_file for audio_file in files}
+    try:
+        for done, future in enumerate(as_completed(futures), start=1):
+            audio_file = futures[future]
+            name = Path(audio_file).name
+            try:
+                result = future.result()
+            except ConversionError as e:
+                failed += 1
+                print(f"[{done}/{len(files)}] {name}: ERROR {e}", file=sys.stderr)
+                continue
+            except Exception as e:
+                failed += 1
+                print(f"[{done}/{len(files)}] {name}: ERROR Error durante la conversión: {e}",
+                      file=sys.stderr)
+                continue
+            try:
+                write_outputs(audio_file, result, out_dir, formats, args.trace,
+                              stems[audio_file])
+            except ExportError as e:
+                failed += 1
+                print(f"[{done}/{len(files)}] {name}: ERROR al exportar: {e}", file=sys.stderr)
+                continue
+            audio_seconds += result.get('duration') or 0
+            print(f"[{done}/{len(files)}] {name}: {result['word_count']} palabras, "
+                  f"{result['processing_time']:.1f} s ({result['cache']})", file=sys.stderr)
+            if args.verbose and result.get('timings'):
+                for line in format_summary(result['timings']).splitlines():
+                    print(f"    {line}", file=sys.stderr)
+    except KeyboardInterrupt:
+        # Ctrl+C: detener los trabajos en curso y descartar los pendientes
+        for job in jobs:
+            job.cancel()
+        executor.shutdown(wait=True, cancel_futures=True)
+        print("Conversión cancelada", file=sys.stderr)
+        return 130
+    executor.shutdown()
+
+    elapsed = time.time() - start
+    summary = f"{len(files) - failed} convertidos, {failed} con errores en {elapsed:.1f} s"
+    if audio_seconds and elapsed:
+        summary += f" ({audio_seconds / elapsed:.1f}x tiempo real)"
+    print(summary, file=sys.stderr)
+    return 1 if failed else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='cli.py',
+        description='Convertidor de audio a texto (línea de comandos)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    transcribe_parser = subparsers.add_parser(
+        'transcribe', help='Transcribe uno o varios archivos de audio')
+    transcribe_parser.add_argument('files', nargs='+', help='Archivos o patrones (*.mp3)')
+    transcribe_parser.add_argument('--out', default='.', help='Directorio de salida')
+    transcribe_parser.add_argument('--format', default='txt',
+                                   help=f"Formatos de salida separados por comas: {', '.join(OUTPUT_FORMATS)}")
+    transcribe_parser.add_argument('--jobs', '-j', type=int, default=1,
+                                   help='Archivos que se convierten a la vez')
+    transcribe_parser.add_argument('--lang', help='Idioma (por defecto, el de config.json)',
+                                   choices=list(AppConfig.SUPPORTED_LANGUAGES))
+    transcribe_parser.add_argument('--backend', choices=list(BACKENDS),
+                                   help='Motor de reconocimiento')
+    transcribe_parser.add_argument('--workers', type=int,
+                                   help='Llamadas de reconocimiento simultáneas por archivo')
+    transcribe_parser.add_argument('--chunk-seconds', type=int,
+                                   help='Duración de cada ventana de transcripción')
+    transcribe_parser.add_argument('--no-cache', action='store_true',
+                                   help='No usar la caché de transcripciones')
+    transcribe_parser.add_argument('--no-vad', action='store_true',
+                                   help='Enviar también los silencios al motor')
+    transcribe_parser.add_argument('--no-resume', action='store_true',
+                                   help='No reanudar ni guardar el avance por ventanas')
+    transcribe_parser.add_argument('--trace', action='store_true',
+                                   help='Guardar los tiempos de cada etapa como traza de Chrome (.trace.json)')
+    transcribe_parser.add_argument('--config', default='config.json',
+                                   help='Archivo de configuración')
+    transcribe_parser.add_argument('--verbose', '-v', action='store_true',
+                                   help='Mostrar el avance de cada archivo')
+    transcribe_parser.set_defaults(handler=transcribe)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
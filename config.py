@@ -1,19 +1,55 @@
 """
 Módulo para gestionar la configuración de la aplicación
 """
+import atexit
 import json
+import os
+import tempfile
+import threading
 from pathlib import Path
 from typing import Any
 
 class AppConfig:
-    """Gestiona la configuración de la aplicación"""
+    """Gestiona la configuración de la aplicación
+
+    Los cambios se guardan en segundo plano: cada modificación programa una
+    escritura que se agrupa con las siguientes durante ``save_delay``
+    segundos. El archivo se reemplaza de forma atómica (archivo temporal y
+    renombrado) y los cambios pendientes se escriben al salir (``flush``).
+    """
+
+    # Segundos de espera para agrupar varias modificaciones en una escritura
+    SAVE_DELAY = 1.0
     
     DEFAULT_CONFIG = {
         'language': 'es-ES',
         'max_duration': None,  # None = sin límite
-        'auto_save': True,
+        'auto_save': True,  # Guardar el avance por ventanas para reanudar archivos largos
         'window_geometry': None,
         'last_path': str(Path.home()),
+        'chunk_seconds': 30,  # Duración de cada ventana de transcripción
+        'recognition_workers': 4,  # Llamadas de reconocimiento simultáneas
+        'vad_enabled': True,  # Omitir los silencios y cortar las ventanas en las pausas
+        'max_concurrent_jobs': 2,  # Archivos del lote que se convierten a la vez
+        'backend': 'google',  # Motor de reconocimiento (ver backends.BACKENDS)
+        'backend_options': {},  # Parámetros por motor, p. ej. {"vosk": {"model_path": "..."}}
+        # Reintentos, límite de peticiones y cortocircuito de los motores remotos
+        'resilience': {
+            'requests_per_second': None,  # None = sin límite
+            'burst': 4,
+            'max_attempts': 4,
+            'base_delay': 0.5,
+            'max_delay': 8.0,
+            'failure_threshold': 5,
+            'reset_timeout': 30.0,
+            'max_circuit_wait': 120.0,  # Espera máxima a que el motor vuelva a responder
+        },
+        'cache_enabled': True,  # Reutilizar transcripciones de audio ya procesado
+        'cache_dir': 'cache',
+        'cache_max_mb': 256,
+        'checkpoint_dir': 'checkpoints',
+        'history_max_entries': None,  # Conversiones que conserva el historial (None = todas)
+        'temp_root': None,  # Raíz de los directorios temporales (None = /dev/shm/convertidor-<uid> o el temporal del sistema)
     }
     
     SUPPORTED_LANGUAGES = {
@@ -28,9 +64,14 @@ class AppConfig:
         'ru-RU': 'Ruso',
     }
     
-    def __init__(self, config_file: str = "config.json"):
+    def __init__(self, config_file: str = "config.json", save_delay: float = SAVE_DELAY):
         self.config_file = Path(config_file)
+        self.save_delay = save_delay
+        self._lock = threading.Lock()
+        self._timer = None
+        self._dirty = False
         self.config = self.load_config()
+        atexit.register(self.flush)
     
     def load_config(self) -> dict:
         """Carga la configuración desde el archivo JSON"""
@@ -45,12 +86,47 @@ class AppConfig:
         return self.DEFAULT_CONFIG.copy()
     
     def save_config(self):
-        """Guarda la configuración en el archivo JSON"""
+        """Programa el guardado de la configuración sin bloquear al llamador"""
+        with self._lock:
+            self._dirty = True
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.save_delay, self.flush)
+            # Hilo demonio: al salir, atexit se encarga de los cambios pendientes
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Escribe ya los cambios pendientes en el archivo JSON"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            self._dirty = False
+            content = json.dumps(dict(self.config), ensure_ascii=False, indent=2)
+            try:
+                self._write_atomic(content)
+            except Exception as e:
+                print(f"Error al guardar configuración: {e}")
+
+    def _write_atomic(self, content: str):
+        """Escribe en un temporal del mismo directorio y lo renombra sobre el archivo"""
+        directory = self.config_file.resolve().parent
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.config-', suffix='.tmp')
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Error al guardar configuración: {e}")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.config_file)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
     
     def get(self, key: str, default: Any = None) -> Any:
         """Obtiene un valor de configuración"""
@@ -82,3 +158,68 @@ class AppConfig:
         else:
             self.config['max_duration'] = max(60, int(duration))
         self.save_config()
+
+    def get_chunk_seconds(self) -> int:
+        """Obtiene la duración en segundos de cada ventana de transcripción"""
+        return max(5, int(self.config.get('chunk_seconds', 30)))
+
+    def set_chunk_seconds(self, seconds: int):
+        """Establece la duración de cada ventana de transcripción (mínimo 5 s)"""
+        self.config['chunk_seconds'] = max(5, int(seconds))
+        self.save_config()
+
+    def get_recognition_workers(self) -> int:
+        """Obtiene el número de llamadas de reconocimiento simultáneas"""
+        return max(1, int(self.config.get('recognition_workers', 4)))
+
+    def get_vad_enabled(self) -> bool:
+        """Indica si se omiten los silencios antes del reconocimiento"""
+        return bool(self.config.get('vad_enabled', True))
+
+    def get_max_concurrent_jobs(self) -> int:
+        """Obtiene el número de archivos del lote que se convierten a la vez"""
+        return max(1, int(self.config.get('max_concurrent_jobs', 2)))
+
+    def get_backend(self) -> str:
+        """Obtiene el nombre del motor de reconocimiento"""
+        return self.config.get('backend', 'google')
+
+    def set_backend(self, backend: str):
+        """Establece el motor de reconocimiento"""
+        self.config['backend'] = backend
+        self.save_config()
+
+    def get_backend_options(self, backend: str = None) -> dict:
+        """Obtiene los parámetros del motor indicado (por defecto, el configurado)"""
+        options = self.config.get('backend_options') or {}
+        return dict(options.get(backend or self.get_backend()) or {})
+
+    def get_resilience_settings(self) -> dict:
+        """Obtiene los parámetros de reintentos y limitación de los motores remotos"""
+        settings = dict(self.DEFAULT_CONFIG['resilience'])
+        settings.update(self.config.get('resilience') or {})
+        return settings
+
+    def get_cache_settings(self) -> dict:
+        """Obtiene la configuración de la caché de transcripciones"""
+        return {
+            'enabled': bool(self.config.get('cache_enabled', True)),
+            'cache_dir': self.config.get('cache_dir', 'cache'),
+            'max_bytes': max(1, int(self.config.get('cache_max_mb', 256))) * 1024 * 1024,
+        }
+
+    def get_checkpoint_settings(self) -> dict:
+        """Obtiene la configuración de los puntos de control (reanudación)"""
+        return {
+            'enabled': bool(self.config.get('auto_save', True)),
+            'checkpoint_dir': self.config.get('checkpoint_dir', 'checkpoints'),
+        }
+
+    def get_history_max_entries(self):
+        """Obtiene el número de conversiones que conserva el historial (None = todas)"""
+        value = self.config.get('history_max_entries')
+        return max(1, int(value)) if value else None
+
+    def get_temp_root(self):
+        """Obtiene la raíz de los directorios temporales (None = por defecto)"""
+        return self.config.get('temp_root') or None
@@ -0,0 +1,127 @@
+"""
+Módulo para decodificar audio a PCM en memoria sin archivos intermedios
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+import wave
+from typing import Iterator, Optional
+
+import speech_recognition as sr
+
+import preprocess
+
+# Formatos que necesitan decodificarse con ffmpeg; los WAV se leen con wave
+COMPRESSED_EXTENSIONS = ('.mp3', '.m4a')
+
+# Formato de salida del decodificador: PCM lineal de 16 bits, mono
+SAMPLE_WIDTH = 2
+DEFAULT_SAMPLE_RATE = 44100
+# Frecuencia que esperan los motores de reconocimiento de voz
+TARGET_SAMPLE_RATE = 16000
+
+
+def needs_decoding(path: str) -> bool:
+    """Indica si el archivo es un formato comprimido que hay que decodificar"""
+    return path.lower().endswith(COMPRESSED_EXTENSIONS)
+
+
+class DecodeError(RuntimeError):
+    """ffmpeg terminó con error: el audio decodificado puede estar incompleto"""
+
+
+def find_ffmpeg() -> str:
+    """Localiza ffmpeg: primero el de imageio-ffmpeg (dependencia de moviepy), luego el del sistema"""
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        path = shutil.which('ffmpeg')
+        if path:
+            return path
+    raise RuntimeError("No se encontró ffmpeg para decodificar el audio")
+
+
+def iter_segments(path: str, segment_seconds: float,
+                  sample_rate: Optional[int] = TARGET_SAMPLE_RATE,
+                  workspace: Optional[str] = None) -> Iterator[sr.AudioData]:
+    """Devuelve el audio en segmentos consecutivos de ``segment_seconds``
+
+    Todos los segmentos son PCM de 16 bits mono a ``sample_rate``. Los WAV
+    se leen directamente del archivo y se mezclan y remuestrean con NumPy;
+    MP3/M4A se decodifican con ffmpeg, que entrega ya el formato pedido, a
+    través de una tubería. En ningún caso se escribe el audio descomprimido
+    a disco ni se mantiene en memoria más de un segmento. Los mensajes de
+    ffmpeg se guardan en ``workspace``, el directorio temporal del trabajo.
+    ``sample_rate`` None conserva la frecuencia original de los WAV.
+    """
+    if not needs_decoding(path):
+        try:
+            # Comprobar la cabecera aquí: los WAV que wave no lee (coma
+            # flotante, WAVE_FORMAT_EXTENSIBLE) se decodifican con ffmpeg
+            wave.open(path, 'rb').close()
+            return _iter_wav_segments(path, segment_seconds, sample_rate)
+        except wave.Error:
+            pass
+        except EOFError:
+            # wave lanza EOFError sin mensaje si la cabecera está incompleta
+            raise DecodeError(f"Archivo WAV vacío o truncado: {os.path.basename(path)}")
+    return _iter_decoded_segments(path, segment_seconds,
+                                  sample_rate or DEFAULT_SAMPLE_RATE, workspace)
+
+
+def _iter_wav_segments(path, segment_seconds, sample_rate):
+    with wave.open(path, 'rb') as source:
+        source_rate = source.getframerate()
+        target_rate = sample_rate or source_rate
+        width = source.getsampwidth()
+        channels = source.getnchannels()
+        frames = max(1, int(segment_seconds * source_rate))
+        while True:
+            data = source.readframes(frames)
+            if not data:
+                break
+            if channels == 1 and width == SAMPLE_WIDTH and source_rate == target_rate:
+                yield sr.AudioData(data, target_rate, SAMPLE_WIDTH)
+                continue
+            yield sr.AudioData(preprocess.prepare(data, width, channels, source_rate, target_rate),
+                               target_rate, SAMPLE_WIDTH)
+
+
+def _iter_decoded_segments(path, segment_seconds, sample_rate, workspace):
+    command = [
+        find_ffmpeg(), '-nostdin', '-loglevel', 'error',
+        '-i', path, '-vn',
+        '-f', 's16le', '-acodec', 'pcm_s16le',
+        '-ac', '1', '-ar', str(sample_rate),
+        '-',
+    ]
+    # stderr va a un archivo y no a una tubería: si ffmpeg escribe mucho no se bloquea
+    log = tempfile.TemporaryFile(dir=workspace, prefix='ffmpeg-', suffix='.log')
+    process = subprocess.Popen(
+        command, stdout=subprocess.PIPE, stderr=log,
+        # Evitar que se abra una consola en el ejecutable de Windows
+        creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0),
+    )
+    segment_bytes = max(1, int(segment_seconds * sample_rate)) * SAMPLE_WIDTH
+    try:
+        while True:
+            data = process.stdout.read(segment_bytes)
+            if not data:
+                break
+            yield sr.AudioData(data, sample_rate, SAMPLE_WIDTH)
+        process.wait()
+        # Al cancelar se cierra el generador y no se llega aquí: cualquier otro
+        # código distinto de 0 significa que el audio puede estar truncado
+        if process.returncode != 0:
+            log.seek(0)
+            message = log.read().decode('utf-8', 'replace').strip()
+            raise DecodeError(message or f"ffmpeg terminó con código {process.returncode}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        log.close()
+
@@ -0,0 +1,178 @@
+"""
+Módulo para exportar transcripciones a Word, PDF y Markdown, independiente de Qt
+"""
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+from xml.sax.saxutils import escape
+
+EXPORT_TITLE = 'Transcripción de audio'
+EXPORT_FORMATS = {
+    'docx': 'Word',
+    'pdf': 'PDF',
+    'md': 'Markdown',
+}
+# Longitud máxima de cada párrafo en Word y PDF: las transcripciones suelen
+# ser una única línea y un párrafo enorme se maqueta muy despacio
+PARAGRAPH_CHARS = 2000
+# Tamaño de cada escritura del Markdown
+WRITE_CHARS = 65536
+
+
+class ExportError(Exception):
+    """Error que impide exportar; el mensaje se muestra al usuario"""
+
+
+class ExportCancelled(ExportError):
+    """La exportación se canceló a petición del usuario"""
+
+    def __init__(self, message="Exportación cancelada"):
+        super().__init__(message)
+
+
+def split_paragraphs(text: str, max_chars: int = PARAGRAPH_CHARS) -> Iterator[str]:
+    """Párrafos del texto: cada línea, y las más largas divididas al final de una frase
+
+    Si no hay un punto en la segunda mitad del tramo se corta en el último
+    espacio y, si tampoco lo hay, en ``max_chars``.
+    """
+    for line in text.splitlines():
+        line = line.strip()
+        while len(line) > max_chars:
+            cut = line.rfind('. ', 0, max_chars)
+            if cut > max_chars // 2:
+                cut += 1
+            else:
+                cut = line.rfind(' ', 0, max_chars)
+                if cut <= 0:
+                    cut = max_chars
+            yield line[:cut].strip()
+            line = line[cut:].strip()
+        if line:
+            yield line
+
+
+class _Progress:
+    """Avance de una exportación; solo avisa cuando cambia el porcentaje"""
+
+    def __init__(self, on_progress, cancel_event):
+        self.on_progress = on_progress
+        self.cancel_event = cancel_event
+        self.percent = -1
+
+    def __call__(self, fraction: float, start: int = 0, end: int = 100):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise ExportCancelled()
+        percent = int(start + (end - start) * min(1.0, fraction))
+        if percent > self.percent:
+            self.percent = percent
+            if self.on_progress is not None:
+                self.on_progress(percent)
+
+
+@contextmanager
+def _atomic_output(path: str, suffix: str):
+    """Ruta temporal en el mismo directorio que se renombra sobre ``path`` al terminar"""
+    # Nombre único sin crear el archivo: así se crea con los permisos habituales
+    temp_path = str(Path(path).resolve().parent / f".export-{uuid.uuid4().hex}{suffix}")
+    try:
+        yield temp_path
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def export_markdown(text: str, path: str, title: str = EXPORT_TITLE, progress=None):
+    """Markdown: el título y el texto tal cual, escrito por tramos"""
+    progress = progress or _Progress(None, None)
+    with _atomic_output(path, '.md') as temp_path:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(f'# {title}\n\n')
+            for start in range(0, len(text), WRITE_CHARS):
+                f.write(text[start:start + WRITE_CHARS])
+                progress((start + WRITE_CHARS) / len(text))
+    progress(1.0)
+
+
+def export_docx(text: str, path: str, title: str = EXPORT_TITLE, progress=None):
+    """Word: un párrafo por cada tramo de ``split_paragraphs``"""
+    try:
+        from docx import Document
+    except ImportError:
+        raise ExportError("python-docx no está instalado")
+    progress = progress or _Progress(None, None)
+    doc = Document()
+    doc.add_heading(title, 0)
+    done = 0
+    for paragraph in split_paragraphs(text):
+        doc.add_paragraph(paragraph)
+        done += len(paragraph)
+        progress(done / len(text), 0, 90)
+    with _atomic_output(path, '.docx') as temp_path:
+        doc.save(temp_path)
+    progress(1.0)
+
+
+def export_pdf(text: str, path: str, title: str = EXPORT_TITLE, progress=None):
+    """PDF: un ``Paragraph`` por cada tramo de ``split_paragraphs``
+
+    Con párrafos cortos reportlab reparte el texto entre páginas sin tener
+    que maquetar de una vez un único párrafo con toda la transcripción.
+    """
+    try:
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+    except ImportError:
+        raise ExportError("reportlab no está instalado")
+    progress = progress or _Progress(None, None)
+    styles = getSampleStyleSheet()
+    story = [Paragraph(escape(title), styles['Heading1']), Spacer(1, 12)]
+    done = 0
+    for paragraph in split_paragraphs(text):
+        story.append(Paragraph(escape(paragraph), styles['BodyText']))
+        done += len(paragraph)
+        progress(done / len(text), 0, 20)
+
+    total = len(story)
+
+    class _ProgressDocTemplate(SimpleDocTemplate):
+        laid_out = 0
+
+        def afterFlowable(self, flowable):
+            self.laid_out += 1
+            progress(self.laid_out / total, 20, 100)
+
+    with _atomic_output(path, '.pdf') as temp_path:
+        _ProgressDocTemplate(temp_path, pagesize=letter, title=title).build(story)
+    progress(1.0)
+
+
+EXPORTERS = {
+    'docx': export_docx,
+    'pdf': export_pdf,
+    'md': export_markdown,
+}
+
+
+def export(text: str, path: str, format_type: str, title: str = EXPORT_TITLE,
+           on_progress: Optional[Callable[[int], None]] = None,
+           cancel_event: Optional[threading.Event] = None):
+    """Exporta ``text`` a ``path`` en el formato indicado
+
+    ``on_progress(int)`` recibe el porcentaje cuando cambia. Si se activa
+    ``cancel_event`` se lanza ``ExportCancelled`` y no queda ningún archivo a
+    medias: se escribe en un temporal que solo sustituye a ``path`` al final.
+    """
+    if format_type not in EXPORTERS:
+        raise ExportError(f"Formato de exportación no soportado: {format_type}")
+    if not text.strip():
+        raise ExportError("No hay texto para exportar")
+    EXPORTERS[format_type](text, path, title, _Progress(on_progress, cancel_event))
@@ -1,5 +1,7 @@
+import re
 import sys
-import speech_recognition as sr
+import threading
+import importlib.util
 import traceback
 from pathlib import Path
 from datetime import datetime
@@ -8,36 +10,92 @@ from PyQt6.QtWidgets import (QApplication, QMainWindow, QPushButton,
                             QProgressBar, QMessageBox, QHBoxLayout, QLabel,
                             QStatusBar, QFrame, QComboBox, QSpinBox, QMenu,
                             QTableWidget, QTableWidgetItem, QDialog, QLineEdit,
+                            QTableView, QAbstractItemView, QCheckBox,
                             QDialogButtonBox, QFormLayout, QTabWidget, QScrollArea)
-from PyQt6.QtCore import Qt, QSize, QByteArray, QTimer
+from PyQt6.QtCore import (Qt, QSize, QByteArray, QTimer, QAbstractTableModel, QModelIndex,
+                          QThread, pyqtSignal)
 from PyQt6.QtGui import QFont, QIcon, QAction, QTextCursor
 import os
-from converter import AudioConverterThread
+import time
+from cache import TranscriptionCache
+from checkpoint import CheckpointStore
+from textsearch import MatchIndex, compile_pattern
+from tracing import export_chrome_trace, format_summary
+from workspace import sweep_orphans
 from styles import StyleSheet
 from history import ConversionHistory
 from config import AppConfig
 
-# Comprobar si python-docx está disponible
-try:
-    from docx import Document
-    HAS_DOCX = True
-except ImportError:
-    HAS_DOCX = False
-
-try:
-    from reportlab.lib.pagesizes import letter
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-    from reportlab.lib.styles import getSampleStyleSheet
-    HAS_REPORTLAB = True
-except:
-    HAS_REPORTLAB = False
+# Comprobar si python-docx y reportlab están disponibles sin importarlos:
+# se cargan al exportar, igual que el reconocimiento de voz al convertir
+HAS_DOCX = importlib.util.find_spec('docx') is not None
+HAS_REPORTLAB = importlib.util.find_spec('reportlab') is not None
+
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.m4a')
+
+# Estados de un trabajo de la cola de conversión
+JOB_STATES = {
+    'pending': 'Pendiente',
+    'running': 'Convirtiendo',
+    'done': 'Completado',
+    'error': 'Error',
+    'cancelled': 'Cancelado',
+}
+
+class ExportThread(QThread):
+    """Exporta un texto con ``exporters.export`` en segundo plano
+
+    ``exporters`` (y python-docx o reportlab) se importan al exportar, no al
+    arrancar la aplicación.
+    """
+
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(str)  # Ruta del archivo exportado
+    error = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, text, file_name, format_type):
+        super().__init__()
+        self.text = text
+        self.file_name = file_name
+        self.format_type = format_type
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        from exporters import ExportCancelled, ExportError, export
+        try:
+            export(self.text, self.file_name, self.format_type,
+                   on_progress=self.progress.emit, cancel_event=self.cancel_event)
+        except ExportCancelled:
+            self.cancelled.emit()
+        except ExportError as e:
+            self.error.emit(str(e))
+        except Exception as e:
+            self.error.emit(f"Error durante la exportación: {str(e)}")
+        else:
+            self.finished.emit(self.file_name)
+
+    def cancel(self):
+        """Solicita la cancelación: no queda ningún archivo a medias"""
+        self.cancel_event.set()
 
 class SearchReplaceDialog(QDialog):
-    """Diálogo para buscar y reemplazar texto"""
+    """Diálogo para buscar y reemplazar texto
+
+    Trabaja con cursores sobre el documento en lugar de reemplazar el texto
+    completo: cada reemplazo (o "Reemplazar todo") es un único paso de
+    deshacer y el documento no se reconstruye. Las coincidencias se guardan
+    en un ``textsearch.MatchIndex`` que se actualiza por tramos al editar,
+    de modo que buscar la siguiente no recorre el texto de nuevo.
+    """
     
     def __init__(self, parent, text_edit):
         super().__init__(parent)
         self.text_edit = text_edit
+        self.document = text_edit.document()
+        self.index = None
+        self.pattern = None
+        self._bulk_edit = False
         self.setWindowTitle('Buscar y reemplazar')
         self.setGeometry(200, 200, 400, 150)
         self.setStyleSheet(StyleSheet.get_styles())
@@ -46,9 +104,22 @@ class SearchReplaceDialog(QDialog):
         
         self.search_input = QLineEdit()
         self.replace_input = QLineEdit()
+        self.case_check = QCheckBox('Distinguir mayúsculas y minúsculas')
+        self.regex_check = QCheckBox('Expresión regular')
+        self.result_label = QLabel('')
         
         layout.addRow('Buscar:', self.search_input)
         layout.addRow('Reemplazar:', self.replace_input)
+        layout.addRow(self.case_check)
+        layout.addRow(self.regex_check)
+        layout.addRow(self.result_label)
+        
+        # Un cambio en la búsqueda invalida el índice; un cambio en el texto lo actualiza
+        self.search_input.textChanged.connect(self.invalidate_index)
+        self.case_check.toggled.connect(self.invalidate_index)
+        self.regex_check.toggled.connect(self.invalidate_index)
+        self.search_input.returnPressed.connect(self.find_text)
+        self.document.contentsChange.connect(self._document_changed)
         
         button_layout = QHBoxLayout()
         
@@ -71,33 +142,125 @@ class SearchReplaceDialog(QDialog):
         
         self.setLayout(layout)
     
+    def invalidate_index(self):
+        self.index = None
+        self.result_label.setText('')
+    
+    def hideEvent(self, event):
+        # Con el diálogo oculto no se mantiene el índice; se reconstruye al buscar
+        self.invalidate_index()
+        super().hideEvent(event)
+    
+    def _read(self, start, end):
+        """Texto del documento entre dos posiciones"""
+        cursor = QTextCursor(self.document)
+        cursor.setPosition(start)
+        cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+        return cursor.selectedText().replace('\u2029', '\n')
+    
+    def _document_length(self):
+        return self.document.characterCount() - 1
+    
+    def _document_changed(self, position, removed, added):
+        if self.index is None or self._bulk_edit:
+            return
+        # Qt informa a veces de cambios que abarcan el separador final del
+        # documento (por ejemplo, con setText); en ese caso se reconstruye
+        if self.index.length + added - removed != self._document_length():
+            self.index = None
+            return
+        self.index.update(position, removed, added)
+    
+    def _get_index(self):
+        """Índice de coincidencias de la búsqueda actual, o None si no hay búsqueda válida"""
+        if self.index is None:
+            query = self.search_input.text()
+            if not query:
+                return None
+            try:
+                self.pattern = compile_pattern(query, self.regex_check.isChecked(),
+                                               self.case_check.isChecked())
+            except re.error as e:
+                self.result_label.setText(f'Expresión no válida: {e}')
+                return None
+            self.index = MatchIndex(self.pattern, self._read, self._document_length())
+        return self.index
+    
+    def _replacement(self, match):
+        """Texto que sustituye a la coincidencia (con grupos \\1 en las expresiones regulares)
+
+        ``match`` es el ``re.Match`` obtenido con el texto que rodea a la
+        coincidencia, de modo que ``^``, ``\\b`` y las búsquedas hacia atrás
+        se evalúan igual que al buscar.
+        """
+        replacement = self.replace_input.text()
+        if not self.regex_check.isChecked() or match is None:
+            return replacement
+        try:
+            return match.expand(replacement)
+        except (re.error, IndexError):
+            return replacement
+    
     def find_text(self):
-        text = self.search_input.text()
-        if text:
-            content = self.text_edit.toPlainText()
-            if text in content:
-                self.text_edit.find(text)
+        """Selecciona la siguiente coincidencia a partir del cursor"""
+        index = self._get_index()
+        if index is None:
+            return
+        match = index.find(self.text_edit.textCursor().selectionEnd())
+        if match is None:
+            self.result_label.setText('No se encontraron coincidencias')
+            return
+        cursor = self.text_edit.textCursor()
+        cursor.setPosition(match[0])
+        cursor.setPosition(match[1], QTextCursor.MoveMode.KeepAnchor)
+        self.text_edit.setTextCursor(cursor)
+        self.text_edit.ensureCursorVisible()
+        self.result_label.setText(f'Coincidencia {index.ordinal(match[0])} de {len(index)}')
     
     def replace_text(self):
-        search_text = self.search_input.text()
-        replace_text = self.replace_input.text()
-        
-        if search_text:
-            content = self.text_edit.toPlainText()
-            new_content = content.replace(search_text, replace_text, 1)
-            self.text_edit.setText(new_content)
+        """Reemplaza la coincidencia seleccionada y pasa a la siguiente"""
+        index = self._get_index()
+        if index is None:
+            return
+        cursor = self.text_edit.textCursor()
+        start, end = cursor.selectionStart(), cursor.selectionEnd()
+        if cursor.hasSelection() and index.contains(start, end):
+            replacement = self._replacement(index.match(start))
+            cursor.beginEditBlock()
+            cursor.insertText(replacement)
+            cursor.endEditBlock()
+            self.text_edit.setTextCursor(cursor)
+        self.find_text()
     
     def replace_all(self):
-        search_text = self.search_input.text()
-        replace_text = self.replace_input.text()
-        
-        if search_text:
-            content = self.text_edit.toPlainText()
-            count = content.count(search_text)
-            new_content = content.replace(search_text, replace_text)
-            self.text_edit.setText(new_content)
-            QMessageBox.information(self, "Resultado", 
-                                  f"Se reemplazaron {count} coincidencias")
+        """Reemplaza todas las coincidencias en un único paso de deshacer"""
+        index = self._get_index()
+        if index is None:
+            return
+        if self.regex_check.isChecked():
+            # Una sola pasada que conserva cada re.Match para expandir sus grupos
+            replacements = [(start, end, self._replacement(match))
+                            for start, end, match in index.scan_matches()]
+        else:
+            replacements = [(start, end, self.replace_input.text())
+                            for start, end in index.matches()]
+        if replacements:
+            cursor = QTextCursor(self.document)
+            # Desde el final para que las posiciones pendientes sigan siendo válidas
+            replacements.reverse()
+            self._bulk_edit = True
+            cursor.beginEditBlock()
+            try:
+                for start, end, replacement in replacements:
+                    cursor.setPosition(start)
+                    cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+                    cursor.insertText(replacement)
+            finally:
+                cursor.endEditBlock()
+                self._bulk_edit = False
+                self.index = None
+        QMessageBox.information(self, "Resultado", 
+                              f"Se reemplazaron {len(replacements)} coincidencias")
 
 class SettingsDialog(QDialog):
     """Diálogo de configuración"""
@@ -123,6 +286,18 @@ class SettingsDialog(QDialog):
         
         layout.addRow('Idioma:', self.language_combo)
         
+        # Selector de motor de reconocimiento
+        from backends import BACKENDS
+        self.backend_combo = QComboBox()
+        for name, backend_class in BACKENDS.items():
+            if backend_class.selectable:
+                self.backend_combo.addItem(backend_class.label, name)
+        index = self.backend_combo.findData(config.get_backend())
+        if index >= 0:
+            self.backend_combo.setCurrentIndex(index)
+        
+        layout.addRow('Motor:', self.backend_combo)
+        
 
         
         # Botones
@@ -143,9 +318,86 @@ class SettingsDialog(QDialog):
     def get_language(self):
         return self.language_combo.currentData()
     
+    def get_backend(self):
+        return self.backend_combo.currentData()
+    
     def get_duration(self):
         return None  # Sin límite
 
+class HistoryTableModel(QAbstractTableModel):
+    """Modelo del historial que carga las filas por páginas al desplazarse
+
+    Solo se leen los datos de la lista (fecha, archivo, vista previa y número
+    de palabras); el texto completo se pide al restaurar una conversión.
+    """
+
+    PAGE_SIZE = 100
+    HEADERS = ['Fecha', 'Archivo', 'Vista previa', 'Palabras']
+
+    def __init__(self, history, parent=None):
+        super().__init__(parent)
+        self.history = history
+        self.query = ''
+        self.rows = []
+        self.exhausted = False
+
+    def set_query(self, query):
+        """Muestra el historial completo o los resultados de la búsqueda"""
+        self.beginResetModel()
+        self.query = query
+        self.rows = []
+        self.exhausted = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted:
+            return
+        offset = len(self.rows)
+        if self.query:
+            page = self.history.search(self.query, self.PAGE_SIZE, offset)
+        else:
+            page = self.history.get_page(offset, self.PAGE_SIZE)
+        self.exhausted = len(page) < self.PAGE_SIZE
+        if page:
+            self.beginInsertRows(QModelIndex(), offset, offset + len(page) - 1)
+            self.rows.extend(page)
+            self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        conv = self.rows[index.row()]
+        column = index.column()
+        if column == 0:
+            try:
+                return datetime.fromisoformat(conv['timestamp']).strftime('%d/%m/%Y %H:%M')
+            except ValueError:
+                return conv['timestamp']
+        if column == 1:
+            return conv['filename']
+        if column == 2:
+            return conv['text_preview']
+        return str(conv['word_count'])
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def conversion_id(self, row):
+        return self.rows[row]['id']
+
+
 class HistoryDialog(QDialog):
     """Diálogo para ver el historial de conversiones"""
     
@@ -159,27 +411,26 @@ class HistoryDialog(QDialog):
         
         layout = QVBoxLayout()
         
-        # Tabla de historial
-        self.table = QTableWidget()
-        self.table.setColumnCount(4)
-        self.table.setHorizontalHeaderLabels(['Fecha', 'Archivo', 'Vista previa', 'Palabras'])
+        # Búsqueda por palabras clave en el texto de las conversiones
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText('Buscar en las transcripciones...')
+        self.search_input.returnPressed.connect(self.load_conversions)
+        layout.addWidget(self.search_input)
+
+        # Tabla de historial: la vista pide más filas al modelo al desplazarse
+        self.model = HistoryTableModel(history, self)
+        self.model.fetchMore()
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
         self.table.setColumnWidth(0, 150)
         self.table.setColumnWidth(1, 150)
         self.table.setColumnWidth(2, 350)
         self.table.setColumnWidth(3, 80)
-        
-        # Llenar la tabla
-        conversions = history.get_history()
-        for i, conv in enumerate(conversions):
-            self.table.insertRow(i)
-            
-            timestamp = datetime.fromisoformat(conv['timestamp']).strftime('%d/%m/%Y %H:%M')
-            self.table.setItem(i, 0, QTableWidgetItem(timestamp))
-            self.table.setItem(i, 1, QTableWidgetItem(conv['filename']))
-            self.table.setItem(i, 2, QTableWidgetItem(conv['text_preview']))
-            
-            word_count = len(conv['full_text'].split())
-            self.table.setItem(i, 3, QTableWidgetItem(str(word_count)))
+        self.table.doubleClicked.connect(self.restore_selection)
         
         layout.addWidget(self.table)
         
@@ -187,14 +438,17 @@ class HistoryDialog(QDialog):
         button_layout = QHBoxLayout()
         
         restore_btn = QPushButton('Restaurar')
+        trace_btn = QPushButton('Exportar traza')
         clear_btn = QPushButton('Limpiar historial')
         close_btn = QPushButton('Cerrar')
         
         restore_btn.clicked.connect(self.restore_selection)
+        trace_btn.clicked.connect(self.export_trace)
         clear_btn.clicked.connect(self.clear_history)
         close_btn.clicked.connect(self.reject)
         
         button_layout.addWidget(restore_btn)
+        button_layout.addWidget(trace_btn)
         button_layout.addWidget(clear_btn)
         button_layout.addStretch()
         button_layout.addWidget(close_btn)
@@ -203,41 +457,78 @@ class HistoryDialog(QDialog):
         
         self.setLayout(layout)
     
+    def load_conversions(self):
+        """Muestra el historial o los resultados de la búsqueda"""
+        self.model.set_query(self.search_input.text().strip())
+
     def restore_selection(self):
-        current_row = self.table.currentRow()
+        current_row = self.table.currentIndex().row()
         if current_row >= 0:
-            conversion = self.history.get_conversion_by_index(current_row)
-            self.selected_text = conversion['full_text']
+            # El texto completo solo se lee de la base de datos al restaurar
+            self.selected_text = self.history.get_text(self.model.conversion_id(current_row))
             self.accept()
     
+    def export_trace(self):
+        """Guarda los tiempos de la conversión seleccionada como traza de Chrome"""
+        current_row = self.table.currentIndex().row()
+        if current_row < 0:
+            return
+        trace = self.history.get_trace(self.model.conversion_id(current_row))
+        if not trace:
+            QMessageBox.information(self, 'Exportar traza',
+                                    'Esta conversión no tiene tiempos registrados.')
+            return
+        filename = self.model.data(self.model.index(current_row, 1)) or 'conversion'
+        file_name, _ = QFileDialog.getSaveFileName(
+            self, 'Exportar traza', f"{Path(filename).stem}.trace.json",
+            'Traza de Chrome (*.json)')
+        if file_name:
+            try:
+                export_chrome_trace(trace, file_name, filename)
+            except OSError as e:
+                QMessageBox.critical(self, 'Error', f'No se pudo guardar la traza: {e}')
+    
     def clear_history(self):
         reply = QMessageBox.question(self, 'Confirmar', 
                                     '¿Desea limpiar todo el historial?',
                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
             self.history.clear_history()
-            self.table.setRowCount(0)
+            self.model.set_query(self.model.query)
 
 class AudioConverterApp(QMainWindow):
     def __init__(self):
         super().__init__()
         self.config = AppConfig()
-        self.history = ConversionHistory()
+        self.history = ConversionHistory(max_entries=self.config.get_history_max_entries())
+        cache_settings = self.config.get_cache_settings()
+        self.cache = (TranscriptionCache(cache_settings['cache_dir'], cache_settings['max_bytes'])
+                      if cache_settings['enabled'] else None)
+        checkpoint_settings = self.config.get_checkpoint_settings()
+        self.checkpoints = (CheckpointStore(checkpoint_settings['checkpoint_dir'])
+                            if checkpoint_settings['enabled'] else None)
+        # Limpiar los directorios temporales de ejecuciones interrumpidas
+        try:
+            sweep_orphans(self.config.get_temp_root())
+            if self.checkpoints is not None:
+                self.checkpoints.prune()
+        except Exception as e:
+            print(f"Error al limpiar temporales: {e}")
         self.setWindowOpacity(0.98)
         self.conversion_data = None
         
         self.initUI()
         self.audio_file = None
-        self.converter_thread = None
-        self.file_queue = []
+        self.file_queue = []  # Trabajos de la cola: un diccionario por archivo
+        self.batch_jobs = []  # Trabajos del lote en curso (o del último lote)
+        self.retired_threads = []  # Hilos cancelados que aún no han terminado
+        self.displayed_job = None
+        self.batch_backend = None
+        self.batch_start = None
         self.is_editing_text = False
-        
-        try:
-            self.recognizer = sr.Recognizer()
-            self.status_bar.showMessage('Sistema inicializado correctamente')
-        except Exception as e:
-            QMessageBox.critical(self, "Error de inicialización", str(e))
-            sys.exit(1)
+        self.search_dialog = None
+        self.export_thread = None
+        self.status_bar.showMessage('Sistema inicializado correctamente')
     
     def initUI(self):
         self.setWindowTitle('Convertidor de audio a texto')
@@ -322,6 +613,20 @@ class AudioConverterApp(QMainWindow):
         self.progress_bar.setFont(QFont('Segoe UI', 9))
         main_layout.addWidget(self.progress_bar)
 
+        # Cola de archivos del lote
+        self.queue_table = QTableWidget()
+        self.queue_table.setColumnCount(3)
+        self.queue_table.setHorizontalHeaderLabels(['Archivo', 'Estado', 'Progreso'])
+        self.queue_table.setColumnWidth(0, 350)
+        self.queue_table.setColumnWidth(1, 250)
+        self.queue_table.setColumnWidth(2, 200)
+        self.queue_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.queue_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.queue_table.setMaximumHeight(180)
+        self.queue_table.setVisible(False)
+        self.queue_table.currentCellChanged.connect(self.select_job)
+        main_layout.addWidget(self.queue_table)
+
         # Contenedor de información
         info_container = QWidget()
         info_container.setStyleSheet(StyleSheet.get_button_container_style())
@@ -332,9 +637,11 @@ class AudioConverterApp(QMainWindow):
         self.duration_label = QLabel('Duración: -')
         self.lang_label = QLabel('Idioma: -')
         self.confidence_label = QLabel('Confianza: -')
+        self.throughput_label = QLabel('Lote: -')
         
         for label in [self.word_count_label, self.char_count_label, 
-                     self.duration_label, self.lang_label, self.confidence_label]:
+                     self.duration_label, self.lang_label, self.confidence_label,
+                     self.throughput_label]:
             label.setFont(QFont('Segoe UI', 9))
             info_layout.addWidget(label)
         
@@ -441,13 +748,7 @@ class AudioConverterApp(QMainWindow):
     def dropEvent(self, event):
         """Maneja el evento de soltar archivos"""
         files = [url.toLocalFile() for url in event.mimeData().urls()]
-        for file_path in files:
-            if file_path.lower().endswith(('.mp3', '.wav', '.m4a')):
-                self.audio_file = file_path
-                self.convert_button.setEnabled(True)
-                self.text_area.setText(f"Archivo cargado: {Path(file_path).name}")
-                self.status_bar.showMessage('Archivo cargado correctamente')
-                break
+        self.add_files(files)
     
     def center_window(self):
         """Centra la ventana en la pantalla actual"""
@@ -458,42 +759,147 @@ class AudioConverterApp(QMainWindow):
     
     def load_audio(self):
         try:
-            file_name, _ = QFileDialog.getOpenFileName(
+            file_names, _ = QFileDialog.getOpenFileNames(
                 self,
-                "Seleccionar archivo de audio",
+                "Seleccionar archivos de audio",
                 self.config.get('last_path', str(Path.home())),
                 "Audio Files (*.mp3 *.wav *.m4a)"
             )
 
-            if file_name:
-                self.audio_file = file_name
-                self.config.set('last_path', str(Path(file_name).parent))
-                self.convert_button.setEnabled(True)
-                self.text_area.setText(f"Archivo cargado: {Path(file_name).name}")
-                self.status_bar.showMessage('Archivo cargado correctamente')
+            if file_names:
+                self.config.set('last_path', str(Path(file_names[0]).parent))
+                self.add_files(file_names)
         except Exception as e:
             self.show_error("Error al cargar el archivo", str(e))
     
+    def add_files(self, file_paths):
+        """Añade archivos de audio a la cola de conversión"""
+        file_paths = [path for path in file_paths if path.lower().endswith(AUDIO_EXTENSIONS)]
+        if not file_paths:
+            return
+        converting = self.is_converting()
+        if not converting:
+            # Un lote nuevo sustituye a los trabajos ya terminados
+            self.file_queue = [job for job in self.file_queue if job['state'] == 'pending']
+            self.queue_table.setRowCount(0)
+            for job in self.file_queue:
+                self._add_queue_row(job)
+        queued = {job['path'] for job in self.file_queue if job['state'] in ('pending', 'running')}
+        for file_path in file_paths:
+            if file_path in queued:
+                continue
+            job = {'path': file_path, 'state': 'pending', 'progress': 0,
+                   'status': '', 'result': None, 'thread': None, 'partial': []}
+            self.file_queue.append(job)
+            self._add_queue_row(job)
+            if converting:
+                # Se suma al lote en curso (y a su progreso agregado)
+                self.batch_jobs.append(job)
+        
+        self.queue_table.setVisible(len(self.file_queue) > 1)
+        self.convert_button.setEnabled(not converting)
+        pending = sum(1 for job in self.file_queue if job['state'] == 'pending')
+        if converting:
+            # El área de texto sigue mostrando el trabajo seleccionado y su texto parcial
+            self.status_bar.showMessage(f'{pending} archivos en cola')
+            self.update_batch_progress()
+            self.start_next_jobs()
+            return
+        self.audio_file = file_paths[-1]
+        if pending == 1:
+            self.text_area.setText(f"Archivo cargado: {Path(file_paths[-1]).name}")
+            self.status_bar.showMessage('Archivo cargado correctamente')
+        else:
+            self.text_area.setText(f"Archivos en cola: {pending}")
+            self.status_bar.showMessage(f'{pending} archivos cargados correctamente')
+    
+    def _add_queue_row(self, job):
+        """Añade la fila de un trabajo a la tabla de la cola"""
+        row = self.queue_table.rowCount()
+        self.queue_table.insertRow(row)
+        self.queue_table.setItem(row, 0, QTableWidgetItem(Path(job['path']).name))
+        self.queue_table.setItem(row, 1, QTableWidgetItem(JOB_STATES[job['state']]))
+        progress_bar = QProgressBar()
+        progress_bar.setValue(job['progress'])
+        self.queue_table.setCellWidget(row, 2, progress_bar)
+        job['row'] = row
+    
+    def _update_queue_row(self, job):
+        """Refresca el estado y el progreso de un trabajo en la tabla"""
+        status = job['status'] if job['state'] == 'running' and job['status'] else JOB_STATES[job['state']]
+        self.queue_table.item(job['row'], 1).setText(status)
+        self.queue_table.cellWidget(job['row'], 2).setValue(job['progress'])
+    
+    def is_converting(self):
+        """Indica si hay trabajos del lote en curso"""
+        return any(job['state'] == 'running' for job in self.file_queue)
+    
     def convert_audio(self):
-        if not self.audio_file:
+        pending = [job for job in self.file_queue if job['state'] == 'pending']
+        if not pending:
+            return
+
+        try:
+            from backends import BACKENDS, create_backend
+            backend_class = BACKENDS.get(self.config.get_backend())
+            if backend_class is not None and not backend_class.selectable:
+                raise ValueError(f"El motor '{backend_class.label}' solo está disponible "
+                                 "en la línea de comandos y en las mediciones")
+            self.batch_backend = create_backend(self.config.get_backend(),
+                                                self.config.get_backend_options(),
+                                                self.config.get_resilience_settings())
+        except Exception as e:
+            self.show_error("Error en el motor de reconocimiento", str(e))
             return
 
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
+        self.batch_start = time.time()
+        self.batch_jobs = pending
+        self.displayed_job = pending[0]
+        self.queue_table.selectRow(pending[0]['row'])
         self.update_ui_state(is_converting=True)
-
+        self.start_next_jobs()
+    
+    def start_next_jobs(self):
+        """Arranca trabajos pendientes hasta llenar el límite de conversiones simultáneas"""
+        from converter import AudioConverterThread
+        running = sum(1 for job in self.file_queue if job['state'] == 'running')
         language = self.language_combo.currentData()
-        self.converter_thread = AudioConverterThread(self.audio_file, self.recognizer, language)
-        self.converter_thread.progress.connect(self.update_progress)
-        self.converter_thread.status.connect(self.update_status)
-        self.converter_thread.finished.connect(self.conversion_finished)
-        self.converter_thread.error.connect(self.show_error)
-        self.converter_thread.start()
+        for job in self.file_queue:
+            if running >= self.config.get_max_concurrent_jobs():
+                break
+            if job['state'] != 'pending':
+                continue
+            thread = AudioConverterThread(
+                job['path'], language,
+                temp_dir=self.config.get_temp_root(),
+                chunk_seconds=self.config.get_chunk_seconds(),
+                max_workers=self.config.get_recognition_workers(),
+                backend=self.batch_backend,
+                cache=self.cache,
+                checkpoints=self.checkpoints,
+                vad=self.config.get_vad_enabled()
+            )
+            thread.progress.connect(lambda value, job=job: self.update_progress(job, value))
+            thread.status.connect(lambda message, job=job: self.update_status(job, message))
+            thread.partial.connect(lambda index, text, job=job: self.append_partial(job, index, text))
+            thread.finished.connect(lambda result, job=job: self.conversion_finished(job, result))
+            thread.error.connect(lambda message, job=job: self.conversion_failed(job, message))
+            job['thread'] = thread
+            job['state'] = 'running'
+            job['partial'] = []
+            self._update_queue_row(job)
+            thread.start()
+            running += 1
+        if not running:
+            self.batch_finished()
     
     def update_ui_state(self, is_converting=False):
         """Actualiza el estado de los botones"""
-        self.convert_button.setEnabled(not is_converting and self.audio_file is not None)
-        self.load_button.setEnabled(not is_converting)
+        has_pending = any(job['state'] == 'pending' for job in self.file_queue)
+        self.convert_button.setEnabled(not is_converting and has_pending)
+        self.load_button.setEnabled(True)
         self.cancel_button.setEnabled(is_converting)
         has_text = bool(self.text_area.toPlainText().strip())
         self.save_button.setEnabled(not is_converting and has_text)
@@ -501,35 +907,106 @@ class AudioConverterApp(QMainWindow):
         self.edit_button.setEnabled(not is_converting and has_text)
         self.language_combo.setEnabled(not is_converting)
     
-    def conversion_finished(self, result):
-        """Maneja el fin de la conversión"""
+    def conversion_finished(self, job, result):
+        """Maneja el fin de la conversión de un archivo del lote"""
+        if job['state'] != 'running':
+            return  # Trabajo cancelado
         try:
+            job['progress'] = 100
             if isinstance(result, dict) and 'text' in result:
-                text = result['text']
-                self.conversion_data = result
-                self.text_area.setText(text)
-                self.status_bar.showMessage('Conversión completada exitosamente')
-                
-                # Actualizar información
-                self.update_info_labels(result)
+                job['state'] = 'done'
+                job['result'] = result
                 
                 # Guardar en historial
                 self.history.add_conversion(
-                    self.audio_file,
-                    text,
+                    job['path'],
+                    result['text'],
                     result.get('duration', 0),
                     result.get('language', 'es-ES'),
-                    result.get('confidence', 0)
+                    result.get('confidence', 0),
+                    result.get('word_count'),
+                    result.get('trace')
                 )
             else:
-                self.text_area.setText("No se pudo extraer texto del audio")
-                self.status_bar.showMessage('Conversión completada sin resultados')
-            
-            self.reset_ui()
+                job['state'] = 'error'
+                job['status'] = 'No se pudo extraer texto del audio'
+            self._update_queue_row(job)
+            if job is self.displayed_job:
+                self.show_job(job)
+            self.update_batch_progress()
+            self.start_next_jobs()
             
         except Exception as e:
             self.show_error("Error al finalizar la conversión", str(e))
     
+    def conversion_failed(self, job, message):
+        """Maneja el error de un archivo del lote sin detener el resto"""
+        if job['state'] != 'running':
+            return  # Trabajo cancelado
+        job['state'] = 'error'
+        job['status'] = message
+        self._update_queue_row(job)
+        self.queue_table.item(job['row'], 1).setToolTip(message)
+        if len(self.batch_jobs) == 1:
+            self.show_error(message)
+        self.update_batch_progress()
+        self.start_next_jobs()
+    
+    def batch_finished(self):
+        """Resume el resultado del lote cuando no quedan trabajos en curso"""
+        done = sum(1 for job in self.batch_jobs if job['state'] == 'done')
+        failed = sum(1 for job in self.batch_jobs if job['state'] == 'error')
+        self.reset_ui()
+        if len(self.batch_jobs) == 1:
+            job = self.batch_jobs[0]
+            if job['state'] == 'done' and job['result'].get('cache') == 'hit':
+                self.status_bar.showMessage('Conversión recuperada de la caché')
+            elif job['state'] == 'done':
+                self.status_bar.showMessage('Conversión completada exitosamente')
+        else:
+            self.status_bar.showMessage(f'Lote completado: {done} convertidos, {failed} con errores')
+    
+    def select_job(self, row, column=0, previous_row=-1, previous_column=-1):
+        """Muestra el texto del trabajo seleccionado en la cola"""
+        for job in self.file_queue:
+            if job.get('row') == row:
+                self.displayed_job = job
+                self.show_job(job)
+                break
+    
+    def show_job(self, job):
+        """Muestra el resultado (o el estado) de un trabajo en el área de texto"""
+        result = job['result']
+        if result:
+            self.conversion_data = result
+            self.audio_file = job['path']
+            # Si ya se mostró por partes no se reconstruye el documento
+            if self.text_area.toPlainText() != result['text']:
+                self.text_area.setText(result['text'])
+            self.update_info_labels(result)
+        elif job['state'] == 'running' and job['partial']:
+            self.text_area.setPlainText(' '.join(job['partial']))
+        elif job['state'] == 'pending':
+            self.text_area.setText(f"Archivo cargado: {Path(job['path']).name}")
+        elif job['state'] == 'running':
+            self.text_area.setText(f"Convirtiendo: {Path(job['path']).name}")
+        else:
+            self.text_area.setText(f"{Path(job['path']).name}: {job['status'] or JOB_STATES[job['state']]}")
+    
+    def update_batch_progress(self):
+        """Actualiza el progreso agregado y el rendimiento del lote"""
+        jobs = self.batch_jobs
+        if not jobs:
+            return
+        self.progress_bar.setValue(sum(job['progress'] for job in jobs) // len(jobs))
+        finished = [job for job in jobs if job['state'] in ('done', 'error', 'cancelled')]
+        audio_seconds = sum(job['result'].get('duration', 0) for job in jobs if job['result'])
+        elapsed = max(time.time() - self.batch_start, 1e-6)
+        text = f'Lote: {len(finished)}/{len(jobs)} archivos'
+        if audio_seconds:
+            text += f' · {audio_seconds / elapsed:.1f}x tiempo real'
+        self.throughput_label.setText(text)
+    
     def update_info_labels(self, result):
         """Actualiza las etiquetas de información"""
         if result:
@@ -544,13 +1021,20 @@ class AudioConverterApp(QMainWindow):
             self.duration_label.setText(f'Duración: {duration:.1f}s' if duration > 0 else 'Duración: -')
             self.lang_label.setText(f'Idioma: {language}')
             self.confidence_label.setText(f'Confianza: {confidence*100:.0f}%' if confidence > 0 else 'Confianza: -')
+            # Tiempo de cada etapa al pasar el ratón sobre la duración
+            timings = result.get('timings')
+            if timings:
+                self.duration_label.setToolTip(
+                    f"Procesado en {result.get('processing_time', 0):.1f} s\n" + format_summary(timings))
+            else:
+                self.duration_label.setToolTip('')
     
     def reset_ui(self):
         """Resetea la interfaz"""
         try:
             self.progress_bar.setVisible(False)
             self.progress_bar.setValue(0)
-            self.convert_button.setEnabled(True)
+            self.convert_button.setEnabled(any(job['state'] == 'pending' for job in self.file_queue))
             self.load_button.setEnabled(True)
             self.cancel_button.setEnabled(False)
             has_text = bool(self.text_area.toPlainText().strip())
@@ -562,19 +1046,71 @@ class AudioConverterApp(QMainWindow):
             self.show_error("Error al resetear la interfaz", str(e))
     
     def cancel_conversion(self):
-        """Cancela la conversión en curso"""
-        if self.converter_thread and self.converter_thread.isRunning():
-            self.converter_thread.cancel()
-            self.converter_thread.wait()
-            self.reset_ui()
-            self.text_area.setText("Conversión cancelada")
-            self.status_bar.showMessage('Conversión cancelada')
+        """Cancela el lote en curso sin bloquear la interfaz"""
+        if not self.is_converting():
+            return
+        for job in self.file_queue:
+            if job['state'] == 'pending' and job in self.batch_jobs:
+                job['state'] = 'cancelled'
+                self._update_queue_row(job)
+        for job in self.file_queue:
+            if job['state'] == 'running':
+                self._cancel_job(job)
+        self.reset_ui()
+        self.text_area.setText("Conversión cancelada")
+        self.status_bar.showMessage('Conversión cancelada')
     
-    def update_progress(self, value):
-        self.progress_bar.setValue(value)
+    def _cancel_job(self, job):
+        """Cancela un trabajo en curso; su hilo termina por su cuenta en segundo plano"""
+        thread = job['thread']
+        thread.cancel()
+        job['state'] = 'cancelled'
+        job['progress'] = 0
+        self._update_queue_row(job)
+        # Conservar la referencia hasta que el hilo termine para que Qt no lo destruya
+        self.retired_threads = [t for t in self.retired_threads if not t.isFinished()]
+        self.retired_threads.append(thread)
     
-    def update_status(self, message):
-        self.status_bar.showMessage(message)
+    def update_progress(self, job, value):
+        if job['state'] != 'running':
+            return
+        job['progress'] = value
+        self._update_queue_row(job)
+        self.update_batch_progress()
+    
+    def update_status(self, job, message):
+        if job['state'] != 'running':
+            return
+        job['status'] = message
+        self._update_queue_row(job)
+        if job is self.displayed_job:
+            self.status_bar.showMessage(message)
+    
+    def append_partial(self, job, index, text):
+        """Añade al área de texto cada segmento en cuanto se reconoce
+
+        El texto se inserta al final del documento con un cursor propio, sin
+        reconstruirlo ni mover la posición de lectura. El índice 0 indica que
+        el texto empieza de nuevo.
+        """
+        if job['state'] != 'running':
+            return
+        if index == 0:
+            job['partial'] = []
+        if not text:
+            if index == 0 and job is self.displayed_job:
+                self.show_job(job)
+            return
+        job['partial'].append(text)
+        if job is not self.displayed_job:
+            return
+        if len(job['partial']) == 1:
+            # Primer texto: sustituye al aviso "Convirtiendo..."
+            self.text_area.setPlainText(text)
+        else:
+            cursor = QTextCursor(self.text_area.document())
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            cursor.insertText(' ' + text)
     
     def copy_to_clipboard(self):
         """Copia el texto al portapapeles"""
@@ -604,9 +1140,13 @@ class AudioConverterApp(QMainWindow):
     
     def open_search_replace(self):
         """Abre el diálogo de búsqueda y reemplazo"""
-        if self.text_area.toPlainText():
-            dialog = SearchReplaceDialog(self, self.text_area)
-            dialog.exec()
+        if not self.text_area.document().isEmpty():
+            # Sin bloquear la ventana, para poder seguir editando con el diálogo abierto
+            if self.search_dialog is None:
+                self.search_dialog = SearchReplaceDialog(self, self.text_area)
+            self.search_dialog.show()
+            self.search_dialog.raise_()
+            self.search_dialog.activateWindow()
     
     def save_text(self):
         """Guarda el texto en archivo"""
@@ -628,68 +1168,64 @@ class AudioConverterApp(QMainWindow):
             self.show_error("Error al guardar el archivo", str(e))
     
     def export_format(self, format_type):
-        """Exporta el texto en diferentes formatos"""
-        if not self.text_area.toPlainText():
+        """Exporta el texto en diferentes formatos en segundo plano"""
+        if self.export_thread is not None:
+            QMessageBox.warning(self, "Advertencia", "Ya hay una exportación en curso")
+            return
+        text = self.text_area.toPlainText()
+        if not text:
             QMessageBox.warning(self, "Advertencia", "No hay texto para exportar")
             return
-        
-        try:
-            if format_type == 'docx':
-                if not HAS_DOCX:
-                    QMessageBox.warning(self, "Advertencia", "python-docx no está instalado")
-                    return
-                
-                file_name, _ = QFileDialog.getSaveFileName(
-                    self, "Guardar como word", str(Path.home()),
-                    "Word Files (*.docx)"
-                )
-                
-                if file_name:
-                    doc = Document()
-                    doc.add_heading('Transcripción de audio', 0)
-                    doc.add_paragraph(self.text_area.toPlainText())
-                    doc.save(file_name)
-                    self.status_bar.showMessage('Documento word guardado')
-                    QMessageBox.information(self, "Éxito", "Archivo word guardado correctamente")
-            
-            elif format_type == 'pdf':
-                if not HAS_REPORTLAB:
-                    QMessageBox.warning(self, "Advertencia", "reportlab no está instalado")
-                    return
-                
-                file_name, _ = QFileDialog.getSaveFileName(
-                    self, "Guardar como PDF", str(Path.home()),
-                    "PDF Files (*.pdf)"
-                )
-                
-                if file_name:
-                    doc = SimpleDocTemplate(file_name, pagesize=letter)
-                    styles = getSampleStyleSheet()
-                    story = []
-                    story.append(Paragraph("Transcripción de audio", styles['Heading1']))
-                    story.append(Spacer(1, 12))
-                    story.append(Paragraph(self.text_area.toPlainText().replace('\n', '<br/>'), 
-                                         styles['BodyText']))
-                    doc.build(story)
-                    self.status_bar.showMessage('PDF guardado')
-                    QMessageBox.information(self, "Éxito", "PDF guardado correctamente")
-            
-            elif format_type == 'md':
-                file_name, _ = QFileDialog.getSaveFileName(
-                    self, "Guardar como markdown", str(Path.home()),
-                    "Markdown Files (*.md)"
-                )
-                
-                if file_name:
-                    with open(file_name, 'w', encoding='utf-8') as f:
-                        f.write('# Transcripción de audio\n\n')
-                        f.write(self.text_area.toPlainText())
-                    self.status_bar.showMessage('Markdown guardado')
-                    QMessageBox.information(self, "Éxito", "Markdown guardado correctamente")
-        
-        except Exception as e:
-            self.show_error(f"Error al exportar como {format_type}", str(e))
-    
+        if format_type == 'docx' and not HAS_DOCX:
+            QMessageBox.warning(self, "Advertencia", "python-docx no está instalado")
+            return
+        if format_type == 'pdf' and not HAS_REPORTLAB:
+            QMessageBox.warning(self, "Advertencia", "reportlab no está instalado")
+            return
+
+        caption, file_filter = {
+            'docx': ("Guardar como word", "Word Files (*.docx)"),
+            'pdf': ("Guardar como PDF", "PDF Files (*.pdf)"),
+            'md': ("Guardar como markdown", "Markdown Files (*.md)"),
+        }[format_type]
+        file_name, _ = QFileDialog.getSaveFileName(self, caption, str(Path.home()), file_filter)
+        if not file_name:
+            return
+
+        # La maquetación (sobre todo la del PDF) puede tardar segundos con
+        # transcripciones largas: se hace fuera del hilo de la interfaz
+        from exporters import EXPORT_FORMATS
+        name = EXPORT_FORMATS[format_type]
+        thread = ExportThread(text, file_name, format_type)
+        thread.progress.connect(
+            lambda value: self.status_bar.showMessage(f'Exportando {name}... {value}%'))
+        thread.finished.connect(lambda path: self.export_finished(format_type))
+        thread.error.connect(
+            lambda message: self.export_failed(f"Error al exportar como {format_type}", message))
+        thread.cancelled.connect(lambda: self.export_failed(None, None))
+        self.export_thread = thread
+        self.status_bar.showMessage(f'Exportando {name}...')
+        thread.start()
+
+    def export_finished(self, format_type):
+        """Muestra el resultado de una exportación terminada"""
+        self.export_thread = None
+        status, message = {
+            'docx': ('Documento word guardado', "Archivo word guardado correctamente"),
+            'pdf': ('PDF guardado', "PDF guardado correctamente"),
+            'md': ('Markdown guardado', "Markdown guardado correctamente"),
+        }[format_type]
+        self.status_bar.showMessage(status)
+        QMessageBox.information(self, "Éxito", message)
+
+    def export_failed(self, title, message):
+        """Muestra el error de una exportación (nada si se canceló)"""
+        self.export_thread = None
+        if title is None:
+            self.status_bar.showMessage('Exportación cancelada')
+        else:
+            self.show_error(title, message)
+
     def show_history(self):
         """Muestra el diálogo de historial"""
         dialog = HistoryDialog(self, self.history)
@@ -707,6 +1243,7 @@ class AudioConverterApp(QMainWindow):
             
             self.config.set_language(new_language)
             self.config.set_max_duration(new_duration)
+            self.config.set_backend(dialog.get_backend())
             
             # Actualizar combo de idioma
             index = self.language_combo.findData(new_language)
@@ -757,18 +1294,36 @@ class AudioConverterApp(QMainWindow):
     
     def closeEvent(self, event):
         """Maneja el evento de cierre"""
-        if self.converter_thread and self.converter_thread.isRunning():
+        # Escribir ya los cambios de configuración pendientes
+        self.config.flush()
+        converting = self.is_converting()
+        exporting = self.export_thread is not None
+        if converting or exporting:
+            if converting and exporting:
+                pending = 'La conversión y la exportación en curso se cancelarán.'
+            elif converting:
+                pending = 'La conversión en curso se cancelará.'
+            else:
+                pending = 'La exportación en curso se cancelará.'
             reply = QMessageBox.question(
                 self, 'Confirmar salida',
-                '¿Está seguro de que desea salir? La conversión en curso se cancelará.',
+                f'¿Está seguro de que desea salir? {pending}',
                 QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
                 QMessageBox.StandardButton.No
             )
 
             if reply == QMessageBox.StandardButton.Yes:
                 try:
-                    self.converter_thread.cancel()
-                    self.converter_thread.wait()
+                    if self.export_thread is not None:
+                        # No queda ningún archivo a medias: se escribe en un temporal
+                        self.export_thread.cancel()
+                        self.export_thread.wait(2000)
+                    for job in self.file_queue:
+                        if job['state'] == 'running':
+                            self._cancel_job(job)
+                    # Espera acotada: los hilos se detienen en el siguiente punto de control
+                    for thread in self.retired_threads:
+                        thread.wait(2000)
                 except Exception as e:
                     print(f"Error al cancelar la conversión: {e}")
                 finally:
@@ -783,17 +1338,6 @@ def main():
     try:
         app_path = Path(__file__).parent
         os.chdir(str(app_path))
-        
-        try:
-            recognizer = sr.Recognizer()
-        except Exception as e:
-            QMessageBox.warning(
-                None, 
-                "Error de inicialización",
-                f"Error al inicializar el sistema:\n{str(e)}\n\n"
-                "Verifica que todas las dependencias están correctamente instaladas."
-            )
-            return
 
         ex = AudioConverterApp()
         ex.show()
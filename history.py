@@ -2,66 +2,214 @@
 Módulo para gestionar el historial de conversiones
 """
 import json
+import sqlite3
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+# Columnas de la lista del historial (sin el texto completo)
+SUMMARY_COLUMNS = ('id', 'timestamp', 'filename', 'text_preview', 'duration',
+                   'language', 'confidence', 'word_count')
+
 
 class ConversionHistory:
-    """Gestiona el historial de conversiones"""
-    
-    def __init__(self, history_file: str = "history.json"):
+    """Gestiona el historial de conversiones
+
+    Las conversiones se guardan en una base de datos SQLite: cada conversión
+    es una única inserción y el texto se indexa con FTS5 para buscar por
+    palabras clave. Si existe un ``history.json`` de versiones anteriores se
+    importa la primera vez. ``max_entries`` limita las conversiones que se
+    conservan (None = todas). Con cada conversión se guardan los intervalos
+    de tiempo de sus etapas (``tracing``) para poder exportar su traza.
+    """
+
+    # 1: tabla inicial e importación de history.json; 2: columna trace
+    SCHEMA_VERSION = 2
+
+    def __init__(self, history_file: str = "history.db", max_entries: Optional[int] = None,
+                 legacy_file: str = "history.json"):
         self.history_file = Path(history_file)
-        self.conversions = self.load_history()
-    
-    def load_history(self) -> List[Dict]:
-        """Carga el historial desde el archivo JSON"""
+        self.legacy_file = Path(legacy_file) if legacy_file else None
+        self.max_entries = max_entries
+        self.has_fts = False
+        self.conn = sqlite3.connect(str(self.history_file))
+        self.conn.row_factory = sqlite3.Row
+        self._create_schema()
+
+    def _create_schema(self):
         try:
-            if self.history_file.exists():
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception as e:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.DatabaseError as e:
             print(f"Error al cargar historial: {e}")
-        return []
-    
-    def save_history(self):
-        """Guarda el historial en el archivo JSON"""
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS conversions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    text_preview TEXT NOT NULL,
+                    full_text TEXT NOT NULL,
+                    duration REAL DEFAULT 0,
+                    language TEXT,
+                    confidence REAL DEFAULT 0,
+                    word_count INTEGER NOT NULL DEFAULT 0,
+                    trace TEXT
+                )""")
+        # Índice de texto completo sincronizado mediante disparadores; si
+        # SQLite no incluye FTS5 la búsqueda recurre a LIKE
         try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.conversions, f, ensure_ascii=False, indent=2)
+            with self.conn:
+                self.conn.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS conversions_fts USING fts5(
+                        full_text, content='conversions', content_rowid='id')""")
+                self.conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS conversions_ai AFTER INSERT ON conversions BEGIN
+                        INSERT INTO conversions_fts(rowid, full_text) VALUES (new.id, new.full_text);
+                    END""")
+                self.conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS conversions_ad AFTER DELETE ON conversions BEGIN
+                        INSERT INTO conversions_fts(conversions_fts, rowid, full_text)
+                        VALUES ('delete', old.id, old.full_text);
+                    END""")
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            self.has_fts = False
+
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            self._import_legacy()
+        if version < 2:
+            columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(conversions)")}
+            if 'trace' not in columns:
+                with self.conn:
+                    self.conn.execute("ALTER TABLE conversions ADD COLUMN trace TEXT")
+        if version < self.SCHEMA_VERSION:
+            self.conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    def _import_legacy(self):
+        """Importa (una sola vez) el historial JSON de versiones anteriores"""
+        if self.legacy_file is None or not self.legacy_file.exists():
+            return
+        try:
+            with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                conversions = json.load(f)
+            # El JSON está ordenado del más reciente al más antiguo
+            with self.conn:
+                for conv in reversed(conversions):
+                    text = conv.get('full_text', '')
+                    self._insert(conv.get('timestamp') or datetime.now().isoformat(),
+                                 conv.get('filename', ''), text,
+                                 conv.get('duration', 0), conv.get('language', 'es-ES'),
+                                 conv.get('confidence', 0), len(text.split()))
         except Exception as e:
+            print(f"Error al importar historial: {e}")
+
+    def _insert(self, timestamp, filename, text, duration, language, confidence, word_count,
+                trace=None):
+        self.conn.execute(
+            """INSERT INTO conversions (timestamp, filename, text_preview, full_text,
+                                        duration, language, confidence, word_count, trace)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (timestamp, filename, text[:100] + '...' if len(text) > 100 else text, text,
+             duration or 0, language, confidence or 0, word_count,
+             json.dumps(trace, ensure_ascii=False) if trace else None))
+
+    def add_conversion(self, filename: str, text: str, duration: float = 0,
+                      language: str = "es-ES", confidence: float = 0,
+                      word_count: Optional[int] = None, trace: Optional[List[Dict]] = None):
+        """Agrega una nueva conversión al historial
+
+        ``trace`` son los intervalos de tiempo de la conversión (``result['trace']``).
+        """
+        if word_count is None:
+            word_count = len(text.split())
+        try:
+            with self.conn:
+                self._insert(datetime.now().isoformat(), Path(filename).name, text,
+                             duration, language, confidence, word_count, trace)
+                if self.max_entries:
+                    # Conservar solo las últimas max_entries conversiones
+                    self.conn.execute(
+                        """DELETE FROM conversions WHERE id <= (
+                               SELECT id FROM conversions ORDER BY id DESC LIMIT 1 OFFSET ?)""",
+                        (int(self.max_entries),))
+        except sqlite3.Error as e:
             print(f"Error al guardar historial: {e}")
-    
-    def add_conversion(self, filename: str, text: str, duration: float = 0, 
-                      language: str = "es-ES", confidence: float = 0):
-        """Agrega una nueva conversión al historial"""
-        conversion = {
-            'timestamp': datetime.now().isoformat(),
-            'filename': Path(filename).name,
-            'text_preview': text[:100] + '...' if len(text) > 100 else text,
-            'full_text': text,
-            'duration': duration,
-            'language': language,
-            'confidence': confidence
-        }
-        
-        # Mantener solo las últimas 20 conversiones
-        self.conversions.insert(0, conversion)
-        if len(self.conversions) > 20:
-            self.conversions = self.conversions[:20]
-        
-        self.save_history()
-    
+
+    def count(self) -> int:
+        """Número de conversiones guardadas"""
+        return self.conn.execute("SELECT COUNT(*) FROM conversions").fetchone()[0]
+
+    def get_page(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict]:
+        """Conversiones de la más reciente a la más antigua, sin el texto completo
+
+        ``limit`` None devuelve todas a partir de ``offset``.
+        """
+        rows = self.conn.execute(
+            f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM conversions "
+            "ORDER BY id DESC LIMIT ? OFFSET ?", (-1 if limit is None else limit, offset))
+        return [dict(row) for row in rows]
+
+    def get_text(self, conversion_id: int) -> Optional[str]:
+        """Texto completo de una conversión"""
+        row = self.conn.execute("SELECT full_text FROM conversions WHERE id = ?",
+                                (conversion_id,)).fetchone()
+        return row[0] if row else None
+
+    def get_trace(self, conversion_id: int) -> Optional[List[Dict]]:
+        """Intervalos de tiempo de una conversión, o None si no se registraron"""
+        row = self.conn.execute("SELECT trace FROM conversions WHERE id = ?",
+                                (conversion_id,)).fetchone()
+        if not row or not row[0]:
+            return None
+        try:
+            return json.loads(row[0])
+        except ValueError:
+            return None
+
+    def search(self, query: str, limit: int = 100, offset: int = 0) -> List[Dict]:
+        """Busca conversiones que contengan todas las palabras de ``query``"""
+        terms = query.split()
+        if not terms:
+            return self.get_page(offset, limit)
+        columns = ', '.join(f"c.{column}" for column in SUMMARY_COLUMNS)
+        if self.has_fts:
+            # Cada palabra entre comillas para que no se interprete como sintaxis FTS5
+            match = ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+            rows = self.conn.execute(
+                f"SELECT {columns} FROM conversions_fts f JOIN conversions c ON c.id = f.rowid "
+                "WHERE conversions_fts MATCH ? ORDER BY f.rank LIMIT ? OFFSET ?",
+                (match, limit, offset))
+        else:
+            conditions = ' AND '.join("c.full_text LIKE ?" for _ in terms)
+            rows = self.conn.execute(
+                f"SELECT {columns} FROM conversions c WHERE {conditions} "
+                "ORDER BY c.id DESC LIMIT ? OFFSET ?",
+                [f"%{term}%" for term in terms] + [limit, offset])
+        return [dict(row) for row in rows]
+
     def get_history(self) -> List[Dict]:
         """Retorna el historial completo"""
-        return self.conversions
-    
+        rows = self.conn.execute("SELECT * FROM conversions ORDER BY id DESC")
+        return [dict(row) for row in rows]
+
     def clear_history(self):
         """Limpia todo el historial"""
-        self.conversions = []
-        self.save_history()
-    
+        try:
+            with self.conn:
+                self.conn.execute("DELETE FROM conversions")
+        except sqlite3.Error as e:
+            print(f"Error al guardar historial: {e}")
+
     def get_conversion_by_index(self, index: int) -> Dict:
         """Obtiene una conversión específica por índice"""
-        if 0 <= index < len(self.conversions):
-            return self.conversions[index]
-        return None
+        if index < 0:
+            return None
+        row = self.conn.execute("SELECT * FROM conversions ORDER BY id DESC LIMIT 1 OFFSET ?",
+                                (index,)).fetchone()
+        return dict(row) if row else None
+
+    def close(self):
+        """Cierra la base de datos"""
+        self.conn.close()
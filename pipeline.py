@@ -0,0 +1,488 @@
+"""
+Módulo con el proceso de conversión de audio a texto, independiente de Qt
+"""
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import CancelledError
+from contextlib import closing
+from typing import Callable, Dict, Optional
+
+import speech_recognition as sr
+
+import decoder
+import probe
+from backends import GoogleBackend, RecognitionBackend
+from progress import ProgressReporter, Throughput, format_duration
+from recognition import RecognitionPool
+from resilience import ResilientBackend
+from tracing import Tracer
+from vad import VoiceActivityDetector
+from workspace import JobWorkspace
+
+from langdetect import detect, DetectorFactory
+DetectorFactory.seed = 0
+
+
+class ConversionError(Exception):
+    """Error que impide completar la conversión; el mensaje se muestra al usuario"""
+
+
+class ConversionCancelled(ConversionError):
+    """La conversión se canceló a petición del usuario"""
+
+    def __init__(self, message="Conversión cancelada"):
+        super().__init__(message)
+
+
+def _ignore(*args):
+    pass
+
+
+def _seconds(audio):
+    """Duración en segundos de un ``sr.AudioData``"""
+    return len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+
+
+class TranscriptionJob:
+    """Convierte un archivo de audio a texto
+
+    Lo usan tanto el hilo de la interfaz (``converter.AudioConverterThread``)
+    como la línea de comandos (``cli.py``). El avance se comunica mediante
+    las funciones ``on_progress(int)`` y ``on_status(str)``, y el texto de cada
+    segmento, en orden y en cuanto se reconoce, con ``on_partial(índice,
+    texto)``; el índice 0 indica que el texto empieza de nuevo (la muestra se
+    retranscribió en el idioma detectado). El avance se
+    calcula a partir del trabajo hecho (audio analizado y segundos de audio
+    reconocidos) y los avisos de cada ventana se agrupan (``ProgressReporter``)
+    para no emitir más de unos pocos por segundo. La duración de cada etapa
+    se registra en ``tracer`` y se devuelve en el resultado.
+    """
+
+    # Muestra para detectar el idioma: palabras mínimas y segmentos máximos
+    DETECTION_MIN_WORDS = 12
+    DETECTION_MAX_SEGMENTS = 4
+    # Tiempo máximo de cada llamada al motor: acota lo que sigue ocupando la
+    # red una llamada en curso después de cancelar
+    OPERATION_TIMEOUT = 30
+    # Avance (%) al terminar el sondeo y el reconocimiento; el reconocimiento
+    # parte de donde quedó el anterior
+    PROBE_PROGRESS = 2
+    RECOGNITION_PROGRESS = 99
+
+    def __init__(self, audio_file: str, language: str = 'es-ES',
+                 temp_dir: Optional[str] = None, chunk_seconds: int = 30,
+                 max_workers: int = 4, backend: Optional[RecognitionBackend] = None,
+                 cache=None, checkpoints=None, vad: bool = False,
+                 on_progress: Callable[[int], None] = None,
+                 on_status: Callable[[str], None] = None,
+                 on_partial: Callable[[int, str], None] = None):
+        self.audio_file = audio_file
+        self.language = language
+        # Raíz de los directorios temporales; cada trabajo crea el suyo
+        self.temp_dir = temp_dir
+        self.job_workspace = JobWorkspace(temp_dir)
+        self.workspace = None
+        self.chunk_seconds = chunk_seconds
+        # Omitir los silencios y cortar las ventanas en las pausas
+        self.vad = vad
+        self.speech_seconds = 0.0
+        self.max_workers = max_workers
+        self.backend = backend or GoogleBackend()
+        self.cache = cache
+        # Registro de ventanas ya transcritas (checkpoint.CheckpointStore)
+        self.checkpoints = checkpoints
+        self.journal = None
+        self.on_progress = on_progress or _ignore
+        self.on_status = on_status or _ignore
+        self.on_partial = on_partial or _ignore
+        self.reporter = ProgressReporter(self.on_progress, self.on_status)
+        self.throughput = None
+        self._progress_lock = threading.Lock()
+        self._recognition_start = 0
+        # Hash del audio que se calcula al decodificar (caché sin el archivo visto)
+        self._audio_hasher = None
+        self.audio_hash = None
+        self._chunks_done = 0
+        self._language = language
+        self._cancel_event = threading.Event()
+        self.media_info = {}
+        self.start_time = None
+        self.tracer = Tracer()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        """Punto de cancelación entre etapas y segmentos"""
+        if self._cancel_event.is_set():
+            raise ConversionCancelled()
+
+    def run(self) -> Dict:
+        """Ejecuta la conversión y devuelve el resultado
+
+        Lanza ``ConversionError`` si falla y ``ConversionCancelled`` si se
+        llama a ``cancel()`` mientras se ejecuta.
+        """
+        try:
+            return self._run()
+        except CancelledError:
+            raise ConversionCancelled()
+        finally:
+            self.reporter.close()
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = None
+            self.job_workspace.remove()
+            self.workspace = None
+
+    def _run(self):
+        self.start_time = time.time()
+        self.reporter.status("Iniciando conversión...", 0)
+        self.workspace = self.job_workspace.create()
+
+        # Leer duración y formato de las cabeceras, sin decodificar
+        try:
+            with self.tracer.span('probe'):
+                self.media_info = probe.probe(self.audio_file)
+        except Exception:
+            self.media_info = {}
+        audio_duration = self.media_info.get('duration') or 0
+        self.check_cancelled()
+
+        # Los MP3/M4A se decodifican en memoria por ventanas; los WAV se leen directamente
+        if decoder.needs_decoding(self.audio_file):
+            file_format = self.audio_file.lower().split('.')[-1].upper()
+            self.reporter.status(f"Decodificando {file_format} en memoria...")
+        else:
+            self.reporter.status("Archivo WAV detectado, procesando...")
+        self.reporter.progress(self.PROBE_PROGRESS)
+
+        # Verificar que el archivo de audio existe antes de procesarlo
+        if not os.path.exists(self.audio_file):
+            raise ConversionError("El archivo de audio no existe o no es válido.")
+
+        # Transcripción por ventanas con speech_recognition y detección de idioma con langdetect
+        try:
+            self.reporter.status("Procesando audio...")
+            lang_code = self.language if self.language else 'es-ES'
+            cache_key = None
+            if self.cache is not None:
+                self.reporter.status("Buscando transcripción en caché...")
+                with self.tracer.span('cache_lookup'):
+                    audio_hash = self.cache.get_audio_hash(self.audio_file)
+                    cached = None
+                    if audio_hash is not None:
+                        cache_key = self._cache_key(audio_hash, lang_code)
+                        cached = self.cache.get(cache_key)
+                    else:
+                        # Archivo no visto: el hash se calcula con el audio que se
+                        # decodifica para transcribir, sin una pasada previa
+                        self._audio_hasher = self.cache.audio_hasher()
+                self.check_cancelled()
+                if cached:
+                    self.reporter.status("Transcripción recuperada de la caché", 100)
+                    return self._build_result(cached['text'], audio_duration,
+                                              cached['language'], 'hit')
+            if self.checkpoints is not None:
+                self.journal = self.checkpoints.open(self.checkpoints.make_key(
+                    self.audio_file, lang_code, self.backend.name, self.chunk_seconds,
+                    self._variant()))
+                if len(self.journal):
+                    self.reporter.status(f"Reanudando: {len(self.journal)} ventanas ya transcritas")
+            self.reporter.status(f"Transcribiendo audio con {self.backend.label}...")
+            # El idioma se detecta con los primeros segmentos con voz y el resto
+            # se transcribe una sola vez en el idioma detectado
+            try:
+                self.reporter.status(f"Transcribiendo audio en idioma seleccionado: {lang_code}...")
+                full_text, idioma_detectado = self.transcribe_chunks(lang_code)
+            except (ConversionCancelled, CancelledError):
+                raise ConversionCancelled()
+            except decoder.DecodeError as e:
+                raise ConversionError(f"Error al decodificar el audio: {str(e)}")
+            except Exception as e:
+                raise ConversionError(f"Error en la transcripción: {str(e)}")
+            self.check_cancelled()
+            if self.vad and audio_duration:
+                skipped = max(0.0, audio_duration - self.speech_seconds)
+                self.reporter.status(f"Se omitieron {skipped:.0f} s de silencio de {audio_duration:.0f} s")
+            idiomas_detectados = idioma_detectado or 'desconocido'
+            self.reporter.status(f"Idioma detectado: {idiomas_detectados}", 100)
+            if self.cache is not None and cache_key is None and self.audio_hash is not None:
+                # El audio se decodificó completo: se guarda su hash para la próxima vez
+                self.cache.remember_audio_hash(self.audio_file, self.audio_hash)
+                cache_key = self._cache_key(self.audio_hash, lang_code)
+            if cache_key:
+                self.cache.put(cache_key, {'text': full_text, 'language': idiomas_detectados})
+            if self.journal is not None:
+                self.journal.discard()
+            return self._build_result(full_text, audio_duration, idiomas_detectados,
+                                      'miss' if self.cache is not None else 'disabled')
+        except ConversionError:
+            raise
+        except decoder.DecodeError as e:
+            # Decodificación incompleta
+            raise ConversionError(f"Error al decodificar el audio: {str(e)}")
+        except Exception as e:
+            raise ConversionError(f"Error durante la conversión: {str(e)}")
+
+    def _build_result(self, text, duration, language, cache_status):
+        """Construye el diccionario con el resultado de la conversión"""
+        return {
+            'text': text,
+            'duration': duration,
+            'language': language,
+            'confidence': 1.0,
+            'processing_time': time.time() - self.start_time,
+            'word_count': len(text.split()),
+            'cache': cache_status,
+            'timings': self.tracer.summary(),
+            'trace': list(self.tracer.spans),
+        }
+
+    def _cache_key(self, audio_hash, language):
+        return self.cache.make_key(audio_hash, language, self.backend.name, self._variant())
+
+    def _variant(self):
+        """Preprocesado que cambia las ventanas enviadas al motor"""
+        return 'vad' if self.vad else ''
+
+    def _iter_decoded(self):
+        """Audio decodificado en ventanas consecutivas de ``chunk_seconds``
+
+        Comprueba la cancelación antes de cada ventana; al cerrar el
+        generador se detiene el proceso del decodificador. El tiempo de
+        obtener cada ventana se registra como ``decode`` (ffmpeg) o ``read``
+        (lectura del WAV). Si hay que calcular el hash del audio para la
+        caché, se actualiza con cada ventana y ``audio_hash`` solo se fija si
+        se llega al final del audio.
+        """
+        hasher, self._audio_hasher = self._audio_hasher, None
+        # Mono a la frecuencia del motor (16 kHz); nunca por encima de la original
+        sample_rate = self.backend.sample_rate
+        source_rate = self.media_info.get('sample_rate')
+        if source_rate:
+            sample_rate = min(source_rate, sample_rate)
+        segments = decoder.iter_segments(self.audio_file, self.chunk_seconds,
+                                         sample_rate=sample_rate,
+                                         workspace=self.workspace)
+        stage = 'decode' if decoder.needs_decoding(self.audio_file) else 'read'
+        try:
+            for index in itertools.count():
+                start = time.perf_counter()
+                audio = next(segments, None)
+                if audio is None:
+                    if hasher is not None:
+                        self.audio_hash = hasher.hexdigest()
+                    break
+                self.tracer.add(stage, start, time.perf_counter(), index=index)
+                self.check_cancelled()
+                if hasher is not None:
+                    hasher.update(audio.frame_data)
+                yield audio
+        finally:
+            segments.close()
+
+    def iter_audio(self):
+        """Segmentos que se envían al motor
+
+        Sin ``vad`` son las ventanas del decodificador; con ``vad`` son los
+        tramos con voz, cortados en las pausas y de hasta ``chunk_seconds``
+        (aproximadamente), con su posición en ``offset``.
+        """
+        decoded = self._iter_decoded()
+        if not self.vad:
+            return decoded
+        return self._iter_speech(decoded)
+
+    def _iter_speech(self, decoded):
+        self.speech_seconds = 0.0
+        speech = VoiceActivityDetector(self.chunk_seconds).split(decoded)
+        try:
+            for segment in speech:
+                self.check_cancelled()
+                self.speech_seconds += segment.duration
+                yield segment
+        finally:
+            speech.close()
+            decoded.close()
+
+    def _new_recognizer(self):
+        recognizer = sr.Recognizer()
+        recognizer.operation_timeout = self.OPERATION_TIMEOUT
+        return recognizer
+
+    def transcribe_chunks(self, language):
+        """Transcribe las ventanas y une los textos en orden
+
+        Los primeros segmentos se reconocen de uno en uno en el idioma
+        seleccionado hasta reunir ``DETECTION_MIN_WORDS`` palabras (o
+        ``DETECTION_MAX_SEGMENTS`` segmentos). Con ese texto se detecta el
+        idioma; si difiere del seleccionado, solo esa muestra se vuelve a
+        reconocer. El resto del audio se reconoce en paralelo, una única vez,
+        en el idioma final. Las ventanas que ya figuran en el registro de
+        reanudación no se vuelven a reconocer. Devuelve
+        ``(texto, código langdetect o None)``.
+        """
+        # El avance se mide en segundos de audio sobre la duración sondeada
+        self.throughput = Throughput(self.media_info.get('duration') or 0)
+        self._recognition_start = self.reporter.percent or 0
+        self._chunks_done = 0
+        self._language = language
+        pool = RecognitionPool(
+            lambda recognizer, item: self._recognize_chunk(recognizer, *item),
+            max_workers=self.max_workers,
+            recognizer_factory=self._new_recognizer)
+        sample, parts = [], []
+        detected = None
+        journal = self.journal
+        with closing(self.iter_audio()) as audio_segments:
+            segments = self._with_silence(audio_segments)
+            if journal is not None and journal.language:
+                # Reanudación con el idioma ya decidido: no hace falta la muestra
+                language, detected = journal.language, journal.detected
+            else:
+                # Muestra inicial en el idioma seleccionado
+                for index, (audio, silence) in enumerate(segments):
+                    sample.append(audio)
+                    parts.append(next(pool.map([(index, audio, language, silence)],
+                                               self._cancel_event)))
+                    self.on_partial(index, parts[-1])
+                    words = sum(len(text.split()) for text in parts)
+                    if words >= self.DETECTION_MIN_WORDS or len(sample) >= self.DETECTION_MAX_SEGMENTS:
+                        break
+                with self.tracer.span('detect_language'):
+                    detected, detected_language = self._detect_language(' '.join(parts))
+                if detected_language and detected_language != language:
+                    try:
+                        self.reporter.status(f"Idioma detectado: {detected}. Retranscribiendo la muestra en {detected_language}...")
+                        with self.tracer.span('retranscribe', language=detected_language,
+                                              segments=len(sample)):
+                            parts = list(pool.map([(index, audio, detected_language)
+                                                   for index, audio in enumerate(sample)],
+                                                  self._cancel_event))
+                        language = self._language = detected_language
+                        for index, text in enumerate(parts):
+                            self.on_partial(index, text)
+                    except CancelledError:
+                        raise
+                    except Exception as e:
+                        self.reporter.status(f"No se pudo retranscribir en {detected_language}: " + str(e))
+                if journal is not None:
+                    journal.set_language(language, detected)
+            sample = None
+
+            # Resto del audio, en paralelo y en el idioma final
+            remaining = ((index, audio, language, silence)
+                         for index, (audio, silence) in enumerate(segments, start=len(parts)))
+            for index, text in enumerate(pool.map(remaining, self._cancel_event),
+                                         start=len(parts)):
+                parts.append(text)
+                self.on_partial(index, text)
+        parts = [text for text in parts if text]
+        if not parts:
+            raise sr.UnknownValueError("No se reconoció voz en el audio")
+        return ' '.join(parts), detected
+
+    def _with_silence(self, segments):
+        """Cada segmento con los segundos de silencio omitidos antes de él"""
+        position = 0.0
+        for audio in segments:
+            offset = getattr(audio, 'offset', position)
+            yield audio, max(0.0, offset - position)
+            position = offset + _seconds(audio)
+
+    def _recognize_chunk(self, recognizer, index, audio, language, silence=None):
+        """Reconoce la ventana ``index`` salvo que ya esté en el registro
+
+        ``silence`` son los segundos omitidos antes de la ventana; None
+        indica que la ventana ya se contó en el avance (retranscripción).
+        """
+        seconds = _seconds(audio)
+        if self.journal is not None:
+            text = self.journal.get(index, language)
+            if text is not None:
+                if silence is not None:
+                    self._advance(seconds + silence, measured=False)
+                return text
+        with self.tracer.span('recognize', index=index, language=language,
+                              seconds=round(seconds, 3)):
+            text = self._recognize(recognizer, audio, language)
+        if self.journal is not None:
+            self.journal.record(index, language, text)
+        if silence is not None:
+            self._advance(seconds, silence)
+        return text
+
+    def _recognize(self, recognizer, audio, language):
+        """Reconoce un segmento; los segmentos sin voz devuelven una cadena vacía"""
+        try:
+            if isinstance(self.backend, ResilientBackend):
+                # Sin más reintentos ni esperas una vez cancelado el trabajo
+                return self.backend.recognize(recognizer, audio, language,
+                                              cancel_event=self._cancel_event)
+            return self.backend.recognize(recognizer, audio, language)
+        except sr.UnknownValueError:
+            # Ventana sin voz reconocible (silencio, ruido)
+            return ''
+
+    def _advance(self, seconds, skipped=0.0, measured=True):
+        """Cuenta una ventana reconocida y avisa del avance y del tiempo restante
+
+        ``skipped`` (silencio omitido) y las ventanas con ``measured`` falso
+        (reanudadas) cuentan como hechas pero no para el ritmo medido.
+        """
+        with self._progress_lock:
+            throughput = self.throughput
+            if measured:
+                throughput.advance(seconds)
+            else:
+                throughput.skip(seconds)
+            throughput.skip(skipped)
+            self._chunks_done += 1
+            message = f"Transcribiendo en {self._language}: "
+            percent = None
+            if throughput.total:
+                message += (f"{format_duration(throughput.done)} de "
+                            f"{format_duration(throughput.total)} de audio")
+                eta = throughput.eta()
+                if eta is not None:
+                    message += f", quedan unos {format_duration(eta)}"
+                percent = self._recognition_start + (
+                    self.RECOGNITION_PROGRESS - self._recognition_start) * throughput.fraction
+            else:
+                message += f"{self._chunks_done} ventanas"
+        self.reporter.update(percent, message)
+
+    def _detect_language(self, text):
+        """Devuelve (código langdetect, código Google) del texto, o (None, None)"""
+        if not text.strip():
+            return None, None
+        try:
+            detected = detect(text)
+        except Exception:
+            return None, None
+        return detected, self._langdetect_to_google_code(detected)
+
+    def _langdetect_to_google_code(self, langdetect_code):
+        """Convierte el código de langdetect a un código de idioma Google Speech Recognition"""
+        mapping = {
+            'es': 'es-ES',
+            'en': 'en-US',
+            'fr': 'fr-FR',
+            'de': 'de-DE',
+            'it': 'it-IT',
+            'pt': 'pt-BR',
+            'ja': 'ja-JP',
+            'zh': 'zh-CN',
+            'ru': 'ru-RU',
+        }
+        return mapping.get(langdetect_code)
+
+    def cancel(self):
+        """Solicita la cancelación; el trabajo se detiene en el siguiente punto de control"""
+        self._cancel_event.set()
+        # Los avisos pendientes ya no se emiten
+        self.reporter.close(flush=False)
@@ -0,0 +1,68 @@
+"""
+Módulo para preparar el audio antes del reconocimiento: mezcla a mono y
+remuestreo a la frecuencia del motor con NumPy
+"""
+import numpy as np
+
+# Coeficientes del filtro paso bajo previo al submuestreo (a cada lado del centro)
+FILTER_HALF_TAPS = 32
+
+
+def pcm_to_float(data: bytes, sample_width: int) -> np.ndarray:
+    """Convierte PCM entero intercalado a float32 en la escala de 16 bits"""
+    if sample_width == 1:
+        # PCM de 8 bits sin signo
+        return (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128.0) * 256.0
+    if sample_width == 2:
+        return np.frombuffer(data, dtype='<i2').astype(np.float32)
+    if sample_width == 3:
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        samples = np.where(samples & 0x800000, samples - 0x1000000, samples)
+        return samples.astype(np.float32) / 256.0
+    if sample_width == 4:
+        return np.frombuffer(data, dtype='<i4').astype(np.float32) / 65536.0
+    raise ValueError(f"Ancho de muestra no soportado: {sample_width}")
+
+
+def to_mono(samples: np.ndarray, channels: int) -> np.ndarray:
+    """Mezcla los canales intercalados en uno solo (media)"""
+    if channels <= 1:
+        return samples
+    frames = len(samples) // channels
+    return samples[:frames * channels].reshape(frames, channels).mean(axis=1)
+
+
+def _lowpass(cutoff: float) -> np.ndarray:
+    """Filtro FIR de sinc con ventana; ``cutoff`` relativo a la frecuencia de muestreo"""
+    n = np.arange(-FILTER_HALF_TAPS, FILTER_HALF_TAPS + 1)
+    taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(len(n))
+    return (taps / taps.sum()).astype(np.float32)
+
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """Cambia la frecuencia de muestreo
+
+    Al reducirla se filtra antes por debajo de la nueva frecuencia de Nyquist
+    para evitar el aliasing; después se interpola linealmente.
+    """
+    if source_rate == target_rate or not len(samples):
+        return samples
+    if target_rate < source_rate:
+        # Corte ligeramente por debajo de la mitad de la nueva frecuencia
+        samples = np.convolve(samples, _lowpass(0.45 * target_rate / source_rate), mode='same')
+    count = int(len(samples) * target_rate / source_rate)
+    positions = np.arange(count, dtype=np.float64) * (source_rate / target_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def to_pcm16(samples: np.ndarray) -> bytes:
+    """Convierte a PCM de 16 bits con signo, recortando los picos"""
+    return np.clip(np.rint(samples), -32768, 32767).astype('<i2').tobytes()
+
+
+def prepare(data: bytes, sample_width: int, channels: int,
+            source_rate: int, target_rate: int) -> bytes:
+    """PCM de cualquier formato entero a PCM de 16 bits mono a ``target_rate``"""
+    samples = to_mono(pcm_to_float(data, sample_width), channels)
+    return to_pcm16(resample(samples, source_rate, target_rate))
@@ -0,0 +1,98 @@
+"""
+Módulo para leer los metadatos de un archivo de audio sin decodificarlo
+"""
+import json
+import os
+import re
+import shutil
+import subprocess
+import wave
+from functools import lru_cache
+from typing import Dict
+
+import decoder
+
+_DURATION_RE = re.compile(r'Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)')
+_AUDIO_STREAM_RE = re.compile(r'Audio:\s*([\w-]+)[^,]*,\s*(\d+)\s*Hz,\s*([^,]+)')
+_CHANNEL_LAYOUTS = {'mono': 1, 'stereo': 2, '2.1': 3, 'quad': 4, '5.0': 5, '5.1': 6, '7.1': 8}
+
+
+def probe(path: str) -> Dict:
+    """Obtiene duración, frecuencia de muestreo, canales y códec del archivo
+
+    Solo se leen las cabeceras del contenedor. El resultado se guarda en
+    caché por (ruta, fecha de modificación, tamaño), de modo que sondear
+    varias veces el mismo archivo no vuelve a lanzar ningún proceso.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    return dict(_probe_cached(path, stat.st_mtime_ns, stat.st_size))
+
+
+@lru_cache(maxsize=256)
+def _probe_cached(path, mtime_ns, size):
+    if not decoder.needs_decoding(path):
+        try:
+            return _probe_wav(path)
+        except (wave.Error, EOFError):
+            # WAV no PCM (p. ej. coma flotante): lo resuelve ffmpeg
+            pass
+    if shutil.which('ffprobe'):
+        return _probe_ffprobe(path)
+    return _probe_ffmpeg(path)
+
+
+def _probe_wav(path):
+    with wave.open(path, 'rb') as wav:
+        sample_rate = wav.getframerate()
+        return {
+            'duration': wav.getnframes() / float(sample_rate) if sample_rate else 0.0,
+            'sample_rate': sample_rate,
+            'channels': wav.getnchannels(),
+            'codec': f'pcm_s{wav.getsampwidth() * 8}le',
+        }
+
+
+def _run(command):
+    return subprocess.run(command, capture_output=True, text=True,
+                          encoding='utf-8', errors='replace',
+                          creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0))
+
+
+def _probe_ffprobe(path):
+    completed = _run(['ffprobe', '-v', 'error', '-select_streams', 'a:0',
+                      '-show_entries', 'format=duration:stream=codec_name,sample_rate,channels',
+                      '-of', 'json', path])
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip() or "No se pudo leer el archivo de audio")
+    data = json.loads(completed.stdout or '{}')
+    stream = (data.get('streams') or [{}])[0]
+    return {
+        'duration': float(data.get('format', {}).get('duration') or 0.0),
+        'sample_rate': int(stream.get('sample_rate') or 0) or None,
+        'channels': stream.get('channels'),
+        'codec': stream.get('codec_name'),
+    }
+
+
+def _probe_ffmpeg(path):
+    # Sin archivo de salida ffmpeg solo lee las cabeceras, imprime la
+    # información del contenedor y termina con error
+    completed = _run([decoder.find_ffmpeg(), '-hide_banner', '-nostdin', '-i', path])
+    output = completed.stderr
+    duration = _DURATION_RE.search(output)
+    stream = _AUDIO_STREAM_RE.search(output)
+    if not stream:
+        raise RuntimeError("No se encontró una pista de audio en el archivo")
+    layout = stream.group(3).strip()
+    channels = _CHANNEL_LAYOUTS.get(layout.split('(')[0])
+    if channels is None:
+        match = re.match(r'(\d+)\s*channels', layout)
+        channels = int(match.group(1)) if match else None
+    return {
+        'duration': (int(duration.group(1)) * 3600 + int(duration.group(2)) * 60
+                     + float(duration.group(3))) if duration else 0.0,
+        'sample_rate': int(stream.group(2)),
+        'channels': channels,
+        'codec': stream.group(1),
+    }
@@ -0,0 +1,151 @@
+"""
+Módulo para calcular el avance de una conversión a partir del trabajo
+realizado, estimar el tiempo restante y limitar la frecuencia de los avisos
+"""
+import threading
+import time
+from typing import Callable, Optional
+
+
+def format_duration(seconds: float) -> str:
+    """Duración legible: ``45 s``, ``3 min 05 s``, ``1 h 05 min``"""
+    seconds = max(0, int(round(seconds)))
+    if seconds < 60:
+        return f"{seconds} s"
+    if seconds < 3600:
+        return f"{seconds // 60} min {seconds % 60:02d} s"
+    return f"{seconds // 3600} h {seconds % 3600 // 60:02d} min"
+
+
+class Throughput:
+    """Trabajo hecho frente al total y ritmo medido
+
+    El trabajo se mide en segundos de audio. ``skip()`` cuenta trabajo que
+    no costó tiempo (ventanas reanudadas, silencios omitidos), de modo que
+    no infle el ritmo con el que se estima el tiempo restante.
+    """
+
+    # Trabajo medido mínimo (segundos de audio) antes de estimar
+    MIN_MEASURED = 1.0
+
+    def __init__(self, total: float):
+        self.total = total
+        self.done = 0.0
+        self.measured = 0.0
+        self.started = time.monotonic()
+
+    def advance(self, amount: float):
+        self.done += amount
+        self.measured += amount
+
+    def skip(self, amount: float):
+        self.done += amount
+
+    @property
+    def fraction(self) -> float:
+        return min(1.0, self.done / self.total) if self.total else 0.0
+
+    def rate(self) -> Optional[float]:
+        """Segundos de audio procesados por segundo, o None si aún no se sabe"""
+        elapsed = time.monotonic() - self.started
+        if self.measured < self.MIN_MEASURED or elapsed <= 0:
+            return None
+        return self.measured / elapsed
+
+    def eta(self) -> Optional[float]:
+        """Segundos que faltan al ritmo medido, o None si aún no se sabe"""
+        rate = self.rate()
+        if not rate or not self.total:
+            return None
+        return max(0.0, self.total - self.done) / rate
+
+
+class ProgressReporter:
+    """Emite el avance (``on_progress``) y el estado (``on_status``) de un trabajo
+
+    ``status()`` y ``progress()`` son avisos puntuales (cambios de etapa) y se
+    emiten de inmediato. ``update()`` es para los avisos frecuentes (cada
+    ventana reconocida): se agrupan para emitir como mucho uno cada
+    ``min_interval`` segundos, siempre el más reciente, y el último se emite
+    aunque no lleguen más. El porcentaje nunca retrocede. Se puede llamar
+    desde varios hilos.
+    """
+
+    MIN_INTERVAL = 0.25
+
+    def __init__(self, on_progress: Callable[[int], None], on_status: Callable[[str], None],
+                 min_interval: float = MIN_INTERVAL):
+        self.on_progress = on_progress
+        self.on_status = on_status
+        self.min_interval = min_interval
+        self.percent = None
+        self._last = float('-inf')
+        self._pending = None
+        self._timer = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def status(self, message: str, percent: Optional[float] = None):
+        """Emite el estado (y el avance) de inmediato, tras lo pendiente"""
+        with self._lock:
+            if self._closed:
+                return
+            self._flush()
+            self._emit(percent, message)
+
+    def progress(self, percent: float):
+        """Emite el avance de inmediato, tras lo pendiente"""
+        self.status(None, percent)
+
+    def update(self, percent: Optional[float] = None, message: Optional[str] = None):
+        """Aviso frecuente: se agrupa con los siguientes hasta ``min_interval``"""
+        with self._lock:
+            if self._closed:
+                return
+            wait = self._last + self.min_interval - time.monotonic()
+            if wait <= 0 and self._timer is None:
+                self._emit(percent, message)
+                return
+            if self._pending:
+                percent = percent if percent is not None else self._pending[0]
+                message = message if message is not None else self._pending[1]
+            self._pending = (percent, message)
+            if self._timer is None:
+                self._timer = threading.Timer(max(0.0, wait), self._on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+            if not self._closed:
+                self._flush()
+
+    def _flush(self):
+        if self._pending:
+            percent, message = self._pending
+            self._pending = None
+            self._emit(percent, message)
+
+    def _emit(self, percent, message):
+        self._last = time.monotonic()
+        if percent is not None:
+            percent = int(percent)
+            if self.percent is None or percent > self.percent:
+                self.percent = percent
+                self.on_progress(percent)
+        if message is not None:
+            self.on_status(message)
+
+    def close(self, flush: bool = True):
+        """Emite lo pendiente (salvo ``flush=False``) y descarta los avisos posteriores"""
+        with self._lock:
+            if self._closed:
+                return
+            if flush:
+                self._flush()
+            self._closed = True
+            self._pending = None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
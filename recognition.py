@@ -0,0 +1,78 @@
+"""
+Módulo para ejecutar el reconocimiento de voz en paralelo
+"""
+import threading
+from collections import deque
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+import speech_recognition as sr
+
+
+class RecognitionPool:
+    """Ejecuta las llamadas de reconocimiento en un grupo acotado de hilos
+
+    Cada hilo trabajador crea su propio ``sr.Recognizer`` para no compartir
+    estado entre llamadas concurrentes. Los resultados se devuelven en el
+    mismo orden en que llegaron los segmentos.
+    """
+
+    def __init__(self, recognize: Callable[[sr.Recognizer, Any], Any],
+                 max_workers: int = 4,
+                 recognizer_factory: Callable[[], sr.Recognizer] = sr.Recognizer):
+        self.recognize = recognize
+        self.max_workers = max(1, int(max_workers))
+        self.recognizer_factory = recognizer_factory
+        self._local = threading.local()
+
+    def _get_recognizer(self) -> sr.Recognizer:
+        """Obtiene (o crea) el reconocedor propio del hilo actual"""
+        recognizer = getattr(self._local, 'recognizer', None)
+        if recognizer is None:
+            recognizer = self.recognizer_factory()
+            self._local.recognizer = recognizer
+        return recognizer
+
+    def _run(self, segment):
+        return self.recognize(self._get_recognizer(), segment)
+
+    def map(self, segments: Iterable,
+            cancel_event: Optional[threading.Event] = None) -> Iterator:
+        """Reconoce los segmentos en paralelo y los devuelve en orden
+
+        Solo se mantienen en memoria ``2 * max_workers`` segmentos pendientes,
+        de modo que la lectura del audio avanza al ritmo del reconocimiento.
+        Si se activa ``cancel_event`` se lanza ``CancelledError`` sin esperar
+        a las llamadas en curso y se descarta el trabajo en cola.
+        """
+        max_pending = self.max_workers * 2
+        pending = deque()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                      thread_name_prefix='recognizer')
+        try:
+            for segment in segments:
+                pending.append(executor.submit(self._run, segment))
+                if len(pending) >= max_pending:
+                    yield self._result(pending.popleft(), cancel_event)
+            while pending:
+                yield self._result(pending.popleft(), cancel_event)
+        finally:
+            # Descartar el trabajo en cola si se interrumpe la iteración; las
+            # llamadas ya en curso terminan por su cuenta y se ignoran
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _result(future, cancel_event):
+        """Espera el resultado comprobando periódicamente la cancelación"""
+        if cancel_event is None:
+            return future.result()
+        while True:
+            if cancel_event.is_set():
+                raise CancelledError()
+            try:
+                return future.result(timeout=0.1)
+            except FutureTimeoutError:
+                continue
@@ -0,0 +1,318 @@
+"""
+Módulo con la capa de resistencia a fallos de los motores remotos:
+limitación de peticiones, reintentos con espera exponencial, cortocircuito
+y conexiones HTTP persistentes
+"""
+import http.client
+import random
+import threading
+import time
+from concurrent.futures import CancelledError
+from typing import Optional
+from urllib.parse import urlsplit
+
+import speech_recognition as sr
+
+
+class TransientError(sr.RequestError):
+    """Fallo pasajero (red, 429, 5xx) que merece reintentarse"""
+
+    def __init__(self, message, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(sr.RequestError):
+    """El motor ha fallado repetidamente y no se le envían más peticiones por ahora"""
+
+
+class TokenBucket:
+    """Limita las peticiones a ``rate`` por segundo con ráfagas de hasta ``capacity``"""
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, cancel_event: Optional[threading.Event] = None):
+        """Espera hasta disponer de un permiso; lanza ``CancelledError`` si se cancela"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            if cancel_event is None:
+                time.sleep(wait)
+            elif cancel_event.wait(wait):
+                raise CancelledError()
+
+
+class CircuitBreaker:
+    """Cortocircuito: tras ``failure_threshold`` fallos seguidos deja de llamar
+
+    Pasados ``reset_timeout`` segundos deja pasar una única llamada de
+    prueba; si funciona se cierra de nuevo y si falla vuelve a abrirse.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+        # Avisa a las llamadas en espera cuando la prueba termina
+        self._changed = threading.Condition(self._lock)
+
+    def _allow(self) -> Optional[float]:
+        if self.state == self.CLOSED:
+            return 0.0
+        if self.state == self.OPEN:
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0:
+                return remaining
+            # Esta llamada es la prueba; las demás esperan a su resultado
+            self.state = self.HALF_OPEN
+            return 0.0
+        # Prueba en curso: hasta que termine
+        return None
+
+    def allow(self) -> Optional[float]:
+        """0 si se puede llamar ahora; si no, los segundos que conviene esperar
+
+        None indica que hay una llamada de prueba en curso y que hay que
+        esperar a su resultado.
+        """
+        with self._lock:
+            return self._allow()
+
+    def acquire(self, timeout: float, cancel_event: Optional[threading.Event] = None) -> bool:
+        """Espera hasta poder llamar; True si hubo que esperar
+
+        Con el circuito abierto espera a que pase ``reset_timeout`` y, con
+        una prueba en curso, a su resultado. Lanza ``CircuitOpenError`` si
+        pasan ``timeout`` segundos sin poder llamar y ``CancelledError`` si se
+        activa ``cancel_event``.
+        """
+        deadline = time.monotonic() + timeout
+        waited = False
+        with self._changed:
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise CancelledError()
+                wait = self._allow()
+                if wait == 0:
+                    return waited
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise CircuitOpenError("Motor no disponible: demasiados fallos seguidos")
+                waited = True
+                wait = remaining if wait is None else min(wait, remaining)
+                if cancel_event is not None:
+                    # Comprobar la cancelación con regularidad
+                    wait = min(wait, 0.1)
+                self._changed.wait(wait)
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._changed.notify_all()
+
+    def release(self):
+        """Deja libre la prueba sin contarla como fallo ni como éxito
+
+        Para las llamadas de prueba que no llegan a decir nada de la salud
+        del motor (errores permanentes, cancelación): la siguiente llamada
+        hace de prueba de inmediato.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic() - self.reset_timeout
+                self._changed.notify_all()
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._changed.notify_all()
+
+
+class ConnectionPool:
+    """Conexiones HTTP persistentes (keep-alive) reutilizables entre hilos"""
+
+    def __init__(self, url: str, max_idle: int = 8):
+        parts = urlsplit(url)
+        self.scheme = parts.scheme or 'http'
+        self.host = parts.hostname
+        self.port = parts.port
+        self.max_idle = max_idle
+        self.created = 0
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _connect(self, timeout):
+        connection_class = (http.client.HTTPSConnection if self.scheme == 'https'
+                            else http.client.HTTPConnection)
+        with self._lock:
+            self.created += 1
+        return connection_class(self.host, self.port, timeout=timeout)
+
+    def _checkout(self, timeout):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._connect(timeout), False
+
+    def _checkin(self, connection):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def request(self, method: str, path: str, body: bytes, headers: dict,
+                timeout: Optional[float] = None):
+        """Envía la petición y devuelve ``(estado, cabeceras, cuerpo)``
+
+        Si una conexión reutilizada resulta estar cerrada por el servidor se
+        repite una vez con una conexión nueva. Los fallos de red se
+        convierten en ``TransientError``.
+        """
+        while True:
+            connection, reused = self._checkout(timeout)
+            try:
+                connection.timeout = timeout
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                connection.close()
+                if reused:
+                    continue
+                raise TransientError(f"Fallo de conexión con el motor: {e}")
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                raise TransientError(f"Fallo de conexión con el motor: {e}")
+            if response.will_close:
+                connection.close()
+            else:
+                self._checkin(connection)
+            return response.status, dict(response.getheaders()), data
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+class ResilientBackend:
+    """Envuelve un motor remoto con limitación, reintentos y cortocircuito
+
+    Los fallos pasajeros (``TransientError``) se reintentan hasta
+    ``max_attempts`` veces con espera exponencial y aleatoria (*full
+    jitter*), respetando ``Retry-After`` si el servidor lo indica (si pide
+    esperar más de ``max_delay`` el fallo se devuelve sin reintentar). Con el
+    circuito abierto las llamadas esperan a la prueba (hasta
+    ``max_circuit_wait`` segundos) en lugar de fallar de inmediato, de modo
+    que ante la saturación el rendimiento baja de forma gradual; esa espera
+    no cuenta como intento. ``UnknownValueError`` y los errores permanentes
+    no se reintentan ni cuentan como fallos para el cortocircuito: solo los
+    fallos pasajeros indican que el motor no está disponible.
+    """
+
+    def __init__(self, backend, requests_per_second: Optional[float] = None,
+                 burst: int = 4, max_attempts: int = 4, base_delay: float = 0.5,
+                 max_delay: float = 8.0, failure_threshold: int = 5,
+                 reset_timeout: float = 30.0, max_circuit_wait: float = 120.0):
+        self.backend = backend
+        self.bucket = TokenBucket(requests_per_second, burst) if requests_per_second else None
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_circuit_wait = max_circuit_wait
+        self.stats = {'calls': 0, 'retries': 0, 'failures': 0, 'circuit_waits': 0}
+        self._lock = threading.Lock()
+
+    @property
+    def name(self):
+        return self.backend.name
+
+    @property
+    def label(self):
+        return self.backend.label
+
+    @property
+    def sample_rate(self):
+        return self.backend.sample_rate
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _backoff(self, attempt, retry_after=None) -> Optional[float]:
+        """Espera antes del siguiente intento, o None si el servidor pide más de ``max_delay``"""
+        if retry_after and retry_after > self.max_delay:
+            return None
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        return max(delay, retry_after or 0)
+
+    def recognize(self, recognizer, audio, language,
+                  cancel_event: Optional[threading.Event] = None):
+        """Reconoce con reintentos; con ``cancel_event`` activado lanza ``CancelledError``
+
+        La cancelación se comprueba antes de cada intento y durante las
+        esperas, de modo que un trabajo cancelado no envía más peticiones.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            if self.breaker.acquire(self.max_circuit_wait, cancel_event):
+                self._count('circuit_waits')
+            if self.bucket is not None:
+                try:
+                    self.bucket.acquire(cancel_event)
+                except CancelledError:
+                    self.breaker.release()
+                    raise
+            self._count('calls')
+            try:
+                text = self.backend.recognize(recognizer, audio, language)
+            except sr.UnknownValueError:
+                self.breaker.record_success()
+                raise
+            except TransientError as e:
+                self.breaker.record_failure()
+                self._count('failures')
+                if attempt == self.max_attempts:
+                    raise
+                delay = self._backoff(attempt, e.retry_after)
+                if delay is None:
+                    # Retry-After mayor que max_delay: no se bloquea el hilo esperando
+                    raise
+                self._count('retries')
+                if cancel_event is None:
+                    time.sleep(delay)
+                elif cancel_event.wait(delay):
+                    raise CancelledError()
+                continue
+            except BaseException:
+                # Error permanente (o interrupción): no dice nada de la
+                # disponibilidad del motor, pero la prueba no puede quedar pendiente
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            return text
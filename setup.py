@@ -3,7 +3,7 @@ import sys
 
 # Dependencias de tu proyecto
 build_exe_options = {
-    "packages": ["os", "sys", "speech_recognition", "moviepy", "PyQt6", "time", "pathlib","traceback","tempfile"],  # Añade las que uses
+    "packages": ["os", "sys", "speech_recognition", "moviepy", "PyQt6", "numpy", "time", "pathlib","traceback","tempfile"],  # Añade las que uses
     "includes": [],
     "include_files": ["favicon.ico","converter.py"],  # Archivos adicionales (iconos, etc.)
     "excludes": [],
@@ -0,0 +1,154 @@
+"""
+Módulo para buscar en textos largos con un índice de coincidencias que se
+actualiza por tramos cuando el texto cambia, independiente de Qt
+"""
+import bisect
+import re
+from typing import Callable, Iterator, Optional, Tuple
+
+try:
+    from re import _parser as _sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse as _sre_parse
+
+
+def compile_pattern(query: str, regex: bool = False, case_sensitive: bool = False):
+    """Compila la búsqueda; lanza ``re.error`` si la expresión regular no es válida"""
+    flags = re.MULTILINE | (0 if case_sensitive else re.IGNORECASE)
+    return re.compile(query if regex else re.escape(query), flags)
+
+
+def max_width(pattern) -> float:
+    """Longitud máxima de una coincidencia; infinita si no está acotada (``.*``, ``\\w+``)"""
+    try:
+        return _sre_parse.parse(pattern.pattern, pattern.flags).getwidth()[1]
+    except Exception:
+        return float('inf')
+
+
+class MatchIndex:
+    """Posiciones (inicio, fin) de las coincidencias de una expresión en un texto
+
+    Se construye recorriendo el texto una vez y después se actualiza con
+    ``update()`` en cada cambio: solo se vuelve a buscar en torno al tramo
+    modificado, las coincidencias anteriores se conservan y las posteriores
+    se desplazan. El texto se lee por tramos con ``reader(inicio, fin)``, sin
+    copiar el documento completo, si las coincidencias de la expresión no
+    pueden superar ``MAX_MATCH`` caracteres. Si pueden (``hola.*``), cada
+    búsqueda lee el texto hasta el final: con tramos una coincidencia larga
+    quedaría cortada en el borde del tramo. Se supone que el contexto que
+    miran las búsquedas hacia atrás y hacia delante no supera
+    ``MAX_MATCH`` caracteres; las coincidencias vacías se ignoran.
+    """
+
+    MAX_MATCH = 1024
+    CHUNK = 65536
+
+    def __init__(self, pattern, reader: Callable[[int, int], str], length: int):
+        self.pattern = pattern
+        self.reader = reader
+        self.length = length
+        self.bounded = max_width(pattern) <= self.MAX_MATCH
+        self.starts = []
+        self.ends = []
+        for start, end in self._scan(0):
+            self.starts.append(start)
+            self.ends.append(end)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _scan(self, position: int) -> Iterator[Tuple[int, int]]:
+        """Coincidencias desde ``position`` hasta el final, leyendo por tramos"""
+        for origin, match in self._scan_matches(position):
+            yield origin + match.start(), origin + match.end()
+
+    def _scan_matches(self, position: int) -> Iterator[Tuple[int, 're.Match']]:
+        """Como ``_scan``, pero con los objetos ``re.Match`` y el origen de su tramo"""
+        last_end = position
+        while position < self.length:
+            end = min(self.length, position + self.CHUNK) if self.bounded else self.length
+            # Con el texto anterior como contexto para \b, ^ y las búsquedas hacia atrás
+            origin = max(0, position - self.MAX_MATCH)
+            text = self.reader(origin, min(self.length, end + self.MAX_MATCH))
+            # Seguir tras la última coincidencia aunque terminara en el tramo siguiente
+            for match in self.pattern.finditer(text, max(position, last_end) - origin):
+                start = origin + match.start()
+                if start >= end:
+                    break
+                if match.end() == match.start():
+                    continue
+                last_end = origin + match.end()
+                yield origin, match
+            position = end
+
+    def scan_matches(self) -> Iterator[Tuple[int, int, 're.Match']]:
+        """Recorre el texto de nuevo: (inicio, fin, ``re.Match``) de cada coincidencia
+
+        Las posiciones del ``re.Match`` son relativas al tramo leído; sirve
+        para sus grupos (``expand()``), evaluados con el mismo contexto que
+        el índice.
+        """
+        for origin, match in self._scan_matches(0):
+            yield origin + match.start(), origin + match.end(), match
+
+    def match(self, start: int) -> Optional['re.Match']:
+        """``re.Match`` de la coincidencia que empieza en ``start``, con su contexto
+
+        Como en ``scan_matches()``, las posiciones son relativas al tramo leído.
+        """
+        origin = max(0, start - self.MAX_MATCH)
+        end = min(self.length, start + 2 * self.MAX_MATCH) if self.bounded else self.length
+        return self.pattern.match(self.reader(origin, end), start - origin)
+
+    def update(self, position: int, removed: int, added: int):
+        """Ajusta el índice tras sustituir ``removed`` caracteres por ``added`` en ``position``"""
+        delta = added - removed
+        self.length += delta
+        # Se conservan las coincidencias que terminan antes del contexto del cambio
+        low = max(0, position - self.MAX_MATCH)
+        first = bisect.bisect_right(self.ends, low)
+        if first < len(self.starts):
+            low = min(low, self.starts[first])
+        # Las que empiezan después del tramo eliminado, desplazadas
+        tail = bisect.bisect_left(self.starts, position + removed, first)
+        shifted_starts = [start + delta for start in self.starts[tail:]]
+        shifted_ends = [end + delta for end in self.ends[tail:]]
+        starts, ends = self.starts[:first], self.ends[:first]
+        # Buscar de nuevo hasta pasar el contexto del cambio y volver a
+        # coincidir con una de las coincidencias desplazadas
+        resync = position + added + self.MAX_MATCH
+        j = 0
+        for start, end in self._scan(low):
+            if start >= resync:
+                while j < len(shifted_starts) and shifted_starts[j] < start:
+                    j += 1
+                if j < len(shifted_starts) and (shifted_starts[j], shifted_ends[j]) == (start, end):
+                    starts.extend(shifted_starts[j:])
+                    ends.extend(shifted_ends[j:])
+                    break
+            starts.append(start)
+            ends.append(end)
+        self.starts, self.ends = starts, ends
+
+    def find(self, position: int, wrap: bool = True) -> Optional[Tuple[int, int]]:
+        """Primera coincidencia que empieza en ``position`` o después (volviendo al principio)"""
+        i = bisect.bisect_left(self.starts, position)
+        if i == len(self.starts):
+            if not wrap or not self.starts:
+                return None
+            i = 0
+        return self.starts[i], self.ends[i]
+
+    def ordinal(self, start: int) -> int:
+        """Número (desde 1) de la coincidencia que empieza en ``start``, o 0"""
+        i = bisect.bisect_left(self.starts, start)
+        return i + 1 if i < len(self.starts) and self.starts[i] == start else 0
+
+    def contains(self, start: int, end: int) -> bool:
+        i = self.ordinal(start) - 1
+        return i >= 0 and self.ends[i] == end
+
+    def matches(self):
+        """Todas las coincidencias, en orden"""
+        return list(zip(self.starts, self.ends))
@@ -0,0 +1,96 @@
+"""
+Módulo para medir el tiempo de cada etapa de una conversión y exportarlo
+como traza de Chrome (chrome://tracing o https://ui.perfetto.dev)
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+
+class Tracer:
+    """Registro de los intervalos (spans) de un trabajo
+
+    Cada intervalo guarda su nombre, inicio (segundos desde que se creó el
+    registro), duración, hilo y datos adicionales. Se puede usar desde
+    varios hilos a la vez. Los intervalos pueden anidarse (por ejemplo, la
+    decodificación dentro de la búsqueda en caché).
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans: List[Dict] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **args):
+        """Mide el bloque ``with`` como un intervalo"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter(), **args)
+
+    def add(self, name: str, start: float, end: float, **args):
+        """Registra un intervalo medido con ``time.perf_counter()``"""
+        span = {'name': name, 'start': round(start - self.origin, 6),
+                'duration': round(end - start, 6),
+                'thread': threading.current_thread().name}
+        if args:
+            span['args'] = args
+        with self._lock:
+            self.spans.append(span)
+
+    def summary(self) -> Dict[str, Dict]:
+        """Número de intervalos, tiempo total y máximo (en segundos) por etapa"""
+        return summarize(self.spans)
+
+
+def summarize(spans: List[Dict]) -> Dict[str, Dict]:
+    """Agrupa los intervalos por nombre"""
+    stages = {}
+    for span in spans:
+        stage = stages.setdefault(span['name'], {'count': 0, 'total': 0.0, 'max': 0.0})
+        stage['count'] += 1
+        stage['total'] += span['duration']
+        stage['max'] = max(stage['max'], span['duration'])
+    for stage in stages.values():
+        stage['total'] = round(stage['total'], 6)
+    return stages
+
+
+def to_chrome_trace(spans: List[Dict], process_name: str = '') -> Dict:
+    """Convierte los intervalos al formato JSON de trazas de Chrome"""
+    threads = {}
+    events = []
+    for span in spans:
+        tid = threads.setdefault(span.get('thread', ''), len(threads) + 1)
+        events.append({'name': span['name'], 'cat': 'conversion', 'ph': 'X',
+                       'ts': span['start'] * 1e6, 'dur': span['duration'] * 1e6,
+                       'pid': 1, 'tid': tid, 'args': span.get('args', {})})
+    events.extend({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid,
+                   'args': {'name': thread}} for thread, tid in threads.items())
+    if process_name:
+        events.append({'name': 'process_name', 'ph': 'M', 'pid': 1,
+                       'args': {'name': process_name}})
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def export_chrome_trace(spans: List[Dict], path: str, process_name: str = ''):
+    """Guarda los intervalos como traza de Chrome en ``path``"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(to_chrome_trace(spans, process_name or os.path.basename(path)), f,
+                  ensure_ascii=False)
+
+
+def format_summary(summary: Dict[str, Dict]) -> str:
+    """Resumen legible: una etapa por línea, de la más lenta a la más rápida"""
+    lines = []
+    for name, stage in sorted(summary.items(), key=lambda item: item[1]['total'], reverse=True):
+        line = f"{name}: {stage['total']:.2f} s"
+        if stage['count'] > 1:
+            line += f" ({stage['count']} llamadas, máx. {stage['max']:.2f} s)"
+        lines.append(line)
+    return '\n'.join(lines)
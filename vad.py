@@ -0,0 +1,171 @@
+"""
+Módulo para detectar la voz por energía y omitir los silencios antes del
+reconocimiento
+"""
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+import speech_recognition as sr
+
+
+class SpeechSegment(sr.AudioData):
+    """Segmento con voz y su posición (en segundos) en el audio original"""
+
+    def __init__(self, frame_data, sample_rate, sample_width, offset: float):
+        super().__init__(frame_data, sample_rate, sample_width)
+        self.offset = offset
+
+    @property
+    def duration(self) -> float:
+        return len(self.frame_data) / (self.sample_rate * self.sample_width)
+
+
+class VoiceActivityDetector:
+    """Divide el audio en segmentos con voz cortando en las pausas naturales
+
+    La energía (RMS) se calcula en tramas de 30 ms y se compara con un umbral
+    que se adapta al ruido de fondo, sin pasar de la mitad del nivel de las
+    tramas más fuertes (un audio sin pausas se envía completo). Los tramos
+    con voz se agrupan hasta ``target_seconds``: cada segmento es una
+    petición al motor, y cortar en cada pausa daría más peticiones que las
+    ventanas fijas. Solo los silencios de ``min_silence`` segundos o más (por
+    defecto, una cuarta parte de ``target_seconds``) cierran antes el
+    segmento y se descartan; las pausas más cortas se conservan. A partir de
+    ``target_seconds`` el segmento se corta en la pausa (de ``pause_seconds``
+    o más) más larga antes de ``max_seconds``, que se descarta, y si no la
+    hay, en la trama más silenciosa de ese intervalo. Cada segmento es un
+    tramo continuo del original y conserva su ``offset``.
+
+    Trabaja sobre los segmentos PCM de 16 bits mono de ``decoder``.
+    """
+
+    FRAME_SECONDS = 0.03
+    # Umbral: ruido de fondo multiplicado por este factor, dentro de estos límites
+    # y sin superar SIGNAL_FACTOR veces el nivel de las tramas más fuertes
+    NOISE_FACTOR = 4.0
+    SIGNAL_FACTOR = 0.5
+    MIN_THRESHOLD = 100.0
+    MAX_THRESHOLD = 1500.0
+
+    def __init__(self, target_seconds: float = 30, max_seconds: Optional[float] = None,
+                 min_silence: Optional[float] = None, pause_seconds: float = 0.3,
+                 padding: float = 0.2, min_speech: float = 0.25,
+                 threshold: Optional[float] = None):
+        self.target_seconds = target_seconds
+        self.max_seconds = max_seconds or target_seconds * 1.5
+        self.min_silence = min_silence or target_seconds / 4
+        self.pause_seconds = pause_seconds
+        self.padding = padding
+        self.min_speech = min_speech
+        self.threshold = threshold
+        self.noise_floor = None
+        self.signal_level = 0.0
+
+    def _frames(self, seconds):
+        return max(1, int(round(seconds / self.FRAME_SECONDS)))
+
+    def _current_threshold(self):
+        if self.threshold is not None:
+            return self.threshold
+        floor = self.noise_floor or 0.0
+        threshold = min(floor * self.NOISE_FACTOR, self.MAX_THRESHOLD,
+                        self.signal_level * self.SIGNAL_FACTOR)
+        return max(self.MIN_THRESHOLD, threshold)
+
+    @staticmethod
+    def _energy(samples, frame_length):
+        count = len(samples) // frame_length
+        frames = samples[:count * frame_length].reshape(count, frame_length).astype(np.float32)
+        return np.sqrt(np.mean(frames * frames, axis=1))
+
+    def _update_noise_floor(self, samples, frame_length):
+        energy = self._energy(samples, frame_length)
+        if len(energy):
+            floor, level = np.percentile(energy, [10, 90])
+            self.noise_floor = float(floor) if self.noise_floor is None else min(self.noise_floor, float(floor))
+            self.signal_level = max(self.signal_level, float(level))
+
+    def split(self, segments: Iterable[sr.AudioData]) -> Iterator[SpeechSegment]:
+        """Devuelve los segmentos con voz del audio recibido por ventanas"""
+        buffer = np.zeros(0, dtype='<i2')
+        start = 0  # Posición (en muestras) de buffer[0] en el audio original
+        sample_rate = None
+        for audio in segments:
+            sample_rate = audio.sample_rate
+            frame_length = max(1, int(sample_rate * self.FRAME_SECONDS))
+            samples = np.frombuffer(audio.frame_data, dtype='<i2')
+            self._update_noise_floor(samples, frame_length)
+            buffer = np.concatenate((buffer, samples))
+            buffer, start = yield from self._drain(buffer, start, sample_rate, final=False)
+        if sample_rate is not None:
+            yield from self._drain(buffer, start, sample_rate, final=True)
+
+    def _drain(self, buffer, start, sample_rate, final):
+        """Emite los segmentos ya decididos; devuelve lo que queda pendiente"""
+        frame_length = max(1, int(sample_rate * self.FRAME_SECONDS))
+        pad = self._frames(self.padding)
+        while True:
+            energy = self._energy(buffer, frame_length)
+            speech = energy > self._current_threshold()
+            # Margen alrededor de la voz para no cortar el principio y el final de las palabras
+            mask = np.convolve(speech.astype(np.int8), np.ones(2 * pad + 1, dtype=np.int8),
+                               mode='same') > 0 if len(speech) else speech
+            cut = self._next_cut(energy, speech, mask, final)
+            if cut is None:
+                # Descartar el silencio inicial, salvo el que aún puede ser margen de voz futura
+                voiced = np.flatnonzero(mask)
+                if len(voiced):
+                    drop = int(voiced[0])
+                else:
+                    drop = len(mask) if final else max(0, len(mask) - pad)
+                buffer = buffer[drop * frame_length:]
+                return buffer, start + drop * frame_length
+            first, last = cut
+            end = last * frame_length
+            if np.count_nonzero(speech[first:last]) >= self._frames(self.min_speech):
+                yield SpeechSegment(buffer[first * frame_length:end].tobytes(), sample_rate, 2,
+                                    (start + first * frame_length) / sample_rate)
+            buffer = buffer[end:]
+            start += end
+            if not len(buffer):
+                return buffer, start
+
+    def _next_cut(self, energy, speech, mask, final):
+        """Límites (tramas) del siguiente segmento, o None si faltan datos
+
+        ``speech`` son las tramas con voz y ``mask`` las mismas con el margen.
+        Las pausas se miden sobre ``speech``; el corte deja como mucho el
+        margen de silencio tras la última trama con voz.
+        """
+        voiced = np.flatnonzero(mask)
+        if not len(voiced):
+            return None
+        first = int(voiced[0])
+        total = len(mask)
+        pad = self._frames(self.padding)
+        limit = first + self._frames(self.max_seconds)
+        target = first + self._frames(self.target_seconds)
+        # Silencios tras la primera trama con voz; los bordes cuentan como voz
+        speaking = first + int(np.argmax(speech[first:]))
+        edges = np.diff(np.concatenate(([1], speech[speaking:].astype(np.int8), [1])))
+        best, best_length = None, 0
+        for silence_start, silence_end in zip(np.flatnonzero(edges == -1) + speaking,
+                                              np.flatnonzero(edges == 1) + speaking):
+            if silence_start >= limit:
+                break
+            length = silence_end - silence_start
+            cut = int(min(silence_start + pad, (silence_start + silence_end) // 2))
+            if length >= self._frames(self.min_silence):
+                return first, cut
+            if (silence_end >= target and length >= self._frames(self.pause_seconds)
+                    and length > best_length):
+                best, best_length = cut, length
+        if final and total <= limit:
+            # Lo que queda cabe en un segmento: una petición, sin el silencio final
+            return first, min(total, int(voiced[-1]) + 1)
+        if total >= limit or final:
+            if best is not None:
+                return first, best
+            # Sin pausas suficientes: cortar en la trama más silenciosa
+            return first, target + int(np.argmin(energy[target:limit]))
+        return None
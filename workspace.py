@@ -0,0 +1,148 @@
+"""
+Módulo para gestionar los directorios temporales de cada conversión
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+OWNER_FILE = '.owner'
+WORKSPACE_PREFIX = 'job-'
+
+
+def _user_dir_name() -> str:
+    """Nombre del directorio raíz propio del usuario actual"""
+    if hasattr(os, 'getuid'):
+        return f'convertidor-{os.getuid()}'
+    # En Windows el directorio temporal ya es propio de cada usuario
+    return 'convertidor'
+
+
+def default_root() -> str:
+    """Directorio raíz de los espacios de trabajo del usuario actual
+
+    Se prefiere /dev/shm (tmpfs) cuando existe, para que los archivos
+    temporales no toquen el disco; si no, el directorio temporal del sistema.
+    Cada usuario tiene su propia raíz: una compartida la crearía el primero
+    con sus permisos y los demás no podrían escribir en ella.
+    """
+    shm = Path('/dev/shm')
+    if shm.is_dir() and os.access(shm, os.W_OK):
+        return str(shm / _user_dir_name())
+    return fallback_root()
+
+
+def fallback_root() -> str:
+    """Raíz en el directorio temporal del sistema, si no se puede usar la preferida"""
+    return os.path.join(tempfile.gettempdir(), _user_dir_name())
+
+
+def _make_private_dir(path: str):
+    """Crea el directorio solo para el usuario actual; falla si es de otro usuario"""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if hasattr(os, 'getuid') and os.stat(path).st_uid != os.getuid():
+        raise PermissionError(f"El directorio temporal pertenece a otro usuario: {path}")
+
+
+def _pid_alive(pid: int) -> bool:
+    """Comprueba si el proceso sigue en ejecución"""
+    if pid <= 0:
+        return False
+    if sys.platform == 'win32':
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        try:
+            exit_code = ctypes.c_ulong()
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+            return exit_code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobWorkspace:
+    """Directorio temporal aislado para una conversión
+
+    Cada trabajo obtiene su propio directorio (``tempfile.mkdtemp``) con un
+    archivo que identifica el proceso propietario, de modo que varias
+    conversiones pueden ejecutarse a la vez sin pisarse y los restos de una
+    ejecución interrumpida se pueden limpiar al arrancar.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or default_root()
+        self.path = None
+
+    def create(self) -> str:
+        """Crea el directorio y devuelve su ruta
+
+        Si no se puede crear la raíz se usa ``fallback_root()``.
+        """
+        try:
+            _make_private_dir(self.root)
+        except OSError:
+            if self.root == fallback_root():
+                raise
+            self.root = fallback_root()
+            _make_private_dir(self.root)
+        self.path = tempfile.mkdtemp(prefix=WORKSPACE_PREFIX, dir=self.root)
+        with open(os.path.join(self.path, OWNER_FILE), 'w', encoding='utf-8') as f:
+            f.write(str(os.getpid()))
+        return self.path
+
+    def remove(self):
+        """Elimina el directorio y todo su contenido"""
+        if self.path:
+            shutil.rmtree(self.path, ignore_errors=True)
+            self.path = None
+
+    def __enter__(self) -> str:
+        return self.create()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.remove()
+
+
+def sweep_orphans(root: Optional[str] = None) -> int:
+    """Elimina los espacios de trabajo de procesos que ya no existen
+
+    Sin ``root`` se revisan la raíz por defecto y la de respaldo. Devuelve el
+    número de directorios eliminados.
+    """
+    roots = [root] if root else list(dict.fromkeys([default_root(), fallback_root()]))
+    return sum(_sweep_root(Path(path)) for path in roots)
+
+
+def _sweep_root(root: Path) -> int:
+    if not root.is_dir():
+        return 0
+    removed = 0
+    for workspace in root.glob(f'{WORKSPACE_PREFIX}*'):
+        if not workspace.is_dir():
+            continue
+        try:
+            pid = int((workspace / OWNER_FILE).read_text(encoding='utf-8').strip())
+        except (OSError, ValueError):
+            # Recién creado por otro proceso que aún no ha escrito su PID
+            try:
+                if time.time() - workspace.stat().st_mtime < 60:
+                    continue
+            except OSError:
+                continue
+            pid = 0
+        if pid != os.getpid() and not _pid_alive(pid):
+            shutil.rmtree(workspace, ignore_errors=True)
+            removed += 1
+    return removed